@@ -4,13 +4,16 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flasgger import Swagger
+from werkzeug.middleware.proxy_fix import ProxyFix
+from datetime import timedelta
 import os
+from app.utils.replica import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 
-def create_app(config_name='development'):
+def create_app(config_name='development', test_config=None):
     app = Flask(__name__)
     
     # Configuration
@@ -18,19 +21,122 @@ def create_app(config_name='development'):
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 
         'sqlite:///performance.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if os.getenv('REPLICA_DATABASE_URL'):
+        app.config['SQLALCHEMY_BINDS'] = {'replica': os.getenv('REPLICA_DATABASE_URL')}
+    app.config['REPLICA_MAX_LAG'] = float(os.getenv('REPLICA_MAX_LAG', 5.0))
+    app.config['REPLICA_LAG_CHECK_INTERVAL'] = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', 1.0))
+    app.config['REPLICA_SYNC_INTERVAL'] = float(os.getenv('REPLICA_SYNC_INTERVAL', 0))
+    app.config['ASYNC_DB_ENABLED'] = os.getenv('ASYNC_DB_ENABLED', 'true').lower() == 'true'
+    app.config['ASYNC_DB_POOL_SIZE'] = int(os.getenv('ASYNC_DB_POOL_SIZE', 7))
+    app.config['ASYNC_DB_MAX_OVERFLOW'] = int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 7))
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 10))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    app.config['DB_POOL_PRE_PING'] = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'wal')
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'normal')
+    app.config['SQLITE_BUSY_TIMEOUT'] = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))
+    app.config['SQLITE_CACHE_SIZE'] = int(os.getenv('SQLITE_CACHE_SIZE', -65536))
+    app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))
+    app.config['LOG_LEVEL'] = os.getenv('LOG_LEVEL', 'INFO')
+    app.config['PROXY_FIX_X_FOR'] = int(os.getenv('PROXY_FIX_X_FOR', 0))
+    # On by default under test so N+1 regressions fail the suite
+    app.config['RAISE_ON_LAZY_LOAD'] = os.getenv(
+        'RAISE_ON_LAZY_LOAD', 'true' if config_name == 'testing' else 'false').lower() == 'true'
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = False
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(
+        minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(
+        days=int(os.getenv('JWT_REFRESH_TOKEN_DAYS', 30)))
+    app.config['JWT_REVOCATION_REBUILD_INTERVAL'] = int(os.getenv('JWT_REVOCATION_REBUILD_INTERVAL', 60))
+    app.config['PRINCIPAL_CACHE_SIZE'] = int(os.getenv('PRINCIPAL_CACHE_SIZE', 1024))
+    app.config['PRINCIPAL_CACHE_TTL'] = int(os.getenv('PRINCIPAL_CACHE_TTL', 5))
+    if os.getenv('PRINCIPAL_CACHE_DB'):
+        app.config['PRINCIPAL_CACHE_DB'] = os.getenv('PRINCIPAL_CACHE_DB')
+    app.config['AUDIT_LOG_ASYNC'] = os.getenv('AUDIT_LOG_ASYNC', 'true').lower() == 'true'
+    app.config['AUDIT_QUEUE_SIZE'] = int(os.getenv('AUDIT_QUEUE_SIZE', 10000))
+    app.config['AUDIT_BATCH_SIZE'] = int(os.getenv('AUDIT_BATCH_SIZE', 500))
+    app.config['AUDIT_FLUSH_INTERVAL'] = float(os.getenv('AUDIT_FLUSH_INTERVAL', 1.0))
+    app.config['PASSWORD_HASH_SCHEME'] = os.getenv('PASSWORD_HASH_SCHEME', 'scrypt')
+    app.config['PASSWORD_HASH_PARAMS'] = {
+        'pbkdf2': {
+            'digest': os.getenv('PBKDF2_DIGEST', 'sha256'),
+            'iterations': int(os.getenv('PBKDF2_ITERATIONS', 600000))
+        },
+        'scrypt': {
+            'n': int(os.getenv('SCRYPT_N', 2 ** 15)),
+            'r': int(os.getenv('SCRYPT_R', 8)),
+            'p': int(os.getenv('SCRYPT_P', 1))
+        },
+        'bcrypt': {
+            'rounds': int(os.getenv('BCRYPT_ROUNDS', 12))
+        }
+    }
+    app.config['LOGIN_RATE_LIMIT_ENABLED'] = os.getenv('LOGIN_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    if os.getenv('LOGIN_RATE_LIMIT_DB'):
+        app.config['LOGIN_RATE_LIMIT_DB'] = os.getenv('LOGIN_RATE_LIMIT_DB')
+    app.config['LOGIN_IP_BURST'] = int(os.getenv('LOGIN_IP_BURST', 20))
+    app.config['LOGIN_IP_RATE'] = float(os.getenv('LOGIN_IP_RATE', 1.0))
+    app.config['LOGIN_EMAIL_BURST'] = int(os.getenv('LOGIN_EMAIL_BURST', 5))
+    app.config['LOGIN_EMAIL_RATE'] = float(os.getenv('LOGIN_EMAIL_RATE', 0.1))
+    app.config['PAGE_SIZE_DEFAULT'] = int(os.getenv('PAGE_SIZE_DEFAULT', 100))
+    app.config['PAGE_SIZE_MAX'] = int(os.getenv('PAGE_SIZE_MAX', 500))
+    app.config['NDJSON_BATCH_SIZE'] = int(os.getenv('NDJSON_BATCH_SIZE', 500))
+    app.config['SYNC_BATCH_SIZE'] = int(os.getenv('SYNC_BATCH_SIZE', 500))
+    app.config['SYNC_SETTLE_SECONDS'] = float(os.getenv('SYNC_SETTLE_SECONDS', 2.0))
+    app.config['SYNC_TOMBSTONE_DAYS'] = int(os.getenv('SYNC_TOMBSTONE_DAYS', 30))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', 5.0))
+    
+    # Overrides must be in place before the extensions read the config
+    if test_config:
+        app.config.update(test_config)
+    
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+    
+    # Behind a load balancer remote_addr is the balancer itself. Trust the
+    # last PROXY_FIX_X_FOR X-Forwarded-For entries (the ones our proxies
+    # appended) so login throttling and audit logs see the client address.
+    if app.config['PROXY_FIX_X_FOR']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
     
     # Initialize extensions
+    from app.utils.engine import engine_options, init_engines
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config), **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
     db.init_app(app)
+    init_engines(app, db)
+    
+    from app.utils.replica import replica_router
+    replica_router.init_app(app, db)
+    
+    from app.utils.async_db import async_db
+    async_db.init_app(app, db)
     migrate.init_app(app, db)
     
     # CORS configuration for production
     cors_origins = os.getenv('CORS_ORIGINS', '*').split(',')
-    CORS(app, origins=cors_origins)
+    CORS(app, origins=cors_origins, expose_headers=['X-Next-Cursor', 'Link', 'ETag'])
     
     jwt.init_app(app)
     
+    from app.utils.revocation import revocation_list
+    revocation_list.init_app(app, jwt)
+    
+    from app.utils.principal_cache import principal_cache
+    principal_cache.init_app(app)
+    
+    from app.utils.audit_writer import audit_writer
+    audit_writer.init_app(app)
+    
+    from app.utils.hashing import hashing
+    hashing.init_app(app)
+    
+    from app.utils.rate_limit import login_throttle
+    login_throttle.init_app(app)
+    
     # Swagger configuration
     swagger_config = {
         "headers": [],
@@ -55,6 +161,7 @@ def create_app(config_name='development'):
     from app.blueprints.reviews import reviews_bp
     from app.blueprints.analytics import analytics_bp
     from app.blueprints.skills import skills_bp
+    from app.blueprints.sync import sync_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(employees_bp, url_prefix='/api/employees')
@@ -62,6 +169,24 @@ def create_app(config_name='development'):
     app.register_blueprint(reviews_bp, url_prefix='/api/reviews')
     app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
     app.register_blueprint(skills_bp, url_prefix='/api/skills')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
+    
+    @app.cli.command('rebuild-org-closure')
+    def rebuild_org_closure():
+        """Recompute the org hierarchy index from users.manager_id."""
+        from app.models import OrgClosure
+        OrgClosure.rebuild()
+    
+    @app.cli.command('sync-replica')
+    def sync_replica():
+        """Copy the SQLite database onto the SQLite read replica."""
+        replica_router.sync()
+    
+    @app.cli.command('prune-tombstones')
+    def prune_tombstones():
+        """Delete sync tombstones older than SYNC_TOMBSTONE_DAYS."""
+        from app.utils.sync import prune_tombstones
+        print(f'Pruned {prune_tombstones()} tombstones')
     
     # Add root route
     @app.route('/')
@@ -75,7 +200,8 @@ def create_app(config_name='development'):
                 'employees': '/api/employees/',
                 'goals': '/api/goals/',
                 'reviews': '/api/reviews/',
-                'analytics': '/api/analytics/'
+                'analytics': '/api/analytics/',
+                'sync': '/api/sync'
             }
         }
     
@@ -1,7 +1,9 @@
 from flask import Blueprint, jsonify
-from sqlalchemy import func, and_
-from app.models import User, Goal, Review, Skill
-from app.utils.decorators import role_required, audit_log
+from sqlalchemy import func, and_, case, select
+from app.models import User, Goal, Review, Skill, Department, SkillName, SkillCategory
+from app.utils.decorators import role_required, audit_log, use_replica
+from app.utils.scopes import team_member_ids
+from app.utils.async_db import async_db
 from app import db
 from datetime import datetime, timedelta
 
@@ -10,7 +12,8 @@ analytics_bp = Blueprint('analytics', __name__)
 @analytics_bp.route('/dashboard', methods=['GET'])
 @role_required('admin', 'manager')
 @audit_log('view_dashboard')
-def get_dashboard_data(current_user):
+@use_replica
+async def get_dashboard_data(current_user):
     """
     Get dashboard analytics
     ---
@@ -22,49 +25,52 @@ def get_dashboard_data(current_user):
       200:
         description: Dashboard data
     """
-    if current_user.role == 'manager':
-        # Manager dashboard - only their team
-        direct_reports = User.query.filter_by(manager_id=current_user.id).all()
-        employee_ids = [emp.id for emp in direct_reports]
-    else:
-        # Admin dashboard - all employees
-        employee_ids = [user.id for user in User.query.filter_by(is_active=True).all()]
+    # Managers get everyone under them at any depth, admins all active users.
+    # This stays a subquery; the IDs are never loaded into Python.
+    employee_ids = team_member_ids(current_user)
     
-    # Goal completion rates
-    total_goals = Goal.query.filter(Goal.employee_id.in_(employee_ids)).count()
-    completed_goals = Goal.query.filter(
-        and_(Goal.employee_id.in_(employee_ids), Goal.status == 'completed')
-    ).count()
-    
-    goal_completion_rate = (completed_goals / total_goals * 100) if total_goals > 0 else 0
+    # Department breakdown: group on the integer key, then look up the names
+    dept_counts = select(
+        User.department_id,
+        func.count(User.id).label('count')
+    ).where(
+        and_(User.id.in_(employee_ids), User.department_id.isnot(None))
+    ).group_by(User.department_id).subquery()
     
-    # Review completion rates
-    total_reviews = Review.query.filter(Review.reviewee_id.in_(employee_ids)).count()
-    completed_reviews = Review.query.filter(
-        and_(Review.reviewee_id.in_(employee_ids), Review.status == 'completed')
-    ).count()
+    # The aggregates are independent, so they run concurrently
+    (total_employees, total_goals, completed_goals, total_reviews, completed_reviews,
+     avg_ratings, dept_stats) = await async_db.gather(
+        select(func.count()).select_from(employee_ids.subquery()),
+        select(func.count(Goal.id)).where(Goal.employee_id.in_(employee_ids)),
+        select(func.count(Goal.id)).where(
+            and_(Goal.employee_id.in_(employee_ids), Goal.status == 'completed')
+        ),
+        select(func.count(Review.id)).where(Review.reviewee_id.in_(employee_ids)),
+        select(func.count(Review.id)).where(
+            and_(Review.reviewee_id.in_(employee_ids), Review.status == 'completed')
+        ),
+        # Average ratings
+        select(
+            func.avg(Review.overall_rating).label('overall'),
+            func.avg(Review.technical_skills).label('technical'),
+            func.avg(Review.communication).label('communication'),
+            func.avg(Review.leadership).label('leadership'),
+            func.avg(Review.teamwork).label('teamwork')
+        ).where(
+            and_(Review.reviewee_id.in_(employee_ids), Review.overall_rating.isnot(None))
+        ),
+        select(Department.name, dept_counts.c.count)
+        .join(dept_counts, Department.id == dept_counts.c.department_id)
+    )
+    total_employees = total_employees.scalar()
+    total_goals, completed_goals = total_goals.scalar(), completed_goals.scalar()
+    total_reviews, completed_reviews = total_reviews.scalar(), completed_reviews.scalar()
+    avg_ratings = avg_ratings.first()
     
+    # Goal and review completion rates
+    goal_completion_rate = (completed_goals / total_goals * 100) if total_goals > 0 else 0
     review_completion_rate = (completed_reviews / total_reviews * 100) if total_reviews > 0 else 0
     
-    # Average ratings
-    avg_ratings = db.session.query(
-        func.avg(Review.overall_rating).label('overall'),
-        func.avg(Review.technical_skills).label('technical'),
-        func.avg(Review.communication).label('communication'),
-        func.avg(Review.leadership).label('leadership'),
-        func.avg(Review.teamwork).label('teamwork')
-    ).filter(
-        and_(Review.reviewee_id.in_(employee_ids), Review.overall_rating.isnot(None))
-    ).first()
-    
-    # Department breakdown
-    dept_stats = db.session.query(
-        User.department,
-        func.count(User.id).label('count')
-    ).filter(
-        and_(User.id.in_(employee_ids), User.department.isnot(None))
-    ).group_by(User.department).all()
-    
     return jsonify({
         'goal_completion_rate': round(goal_completion_rate, 2),
         'review_completion_rate': round(review_completion_rate, 2),
@@ -79,7 +85,7 @@ def get_dashboard_data(current_user):
             {'department': dept, 'count': count} 
             for dept, count in dept_stats
         ],
-        'total_employees': len(employee_ids),
+        'total_employees': total_employees,
         'total_goals': total_goals,
         'total_reviews': total_reviews
     }), 200
@@ -87,6 +93,7 @@ def get_dashboard_data(current_user):
 @analytics_bp.route('/performance-trends', methods=['GET'])
 @role_required('admin', 'manager')
 @audit_log('view_performance_trends')
+@use_replica
 def get_performance_trends(current_user):
     """
     Get performance trends over time
@@ -99,11 +106,7 @@ def get_performance_trends(current_user):
       200:
         description: Performance trends data
     """
-    if current_user.role == 'manager':
-        direct_reports = User.query.filter_by(manager_id=current_user.id).all()
-        employee_ids = [emp.id for emp in direct_reports]
-    else:
-        employee_ids = [user.id for user in User.query.filter_by(is_active=True).all()]
+    employee_ids = team_member_ids(current_user)
     
     # Get monthly performance data for the last 12 months
     end_date = datetime.now()
@@ -137,7 +140,8 @@ def get_performance_trends(current_user):
 @analytics_bp.route('/team-comparison', methods=['GET'])
 @role_required('admin', 'manager')
 @audit_log('view_team_comparison')
-def get_team_comparison(current_user):
+@use_replica
+async def get_team_comparison(current_user):
     """
     Get team performance comparison
     ---
@@ -150,55 +154,73 @@ def get_team_comparison(current_user):
         description: Team comparison data
     """
     if current_user.role == 'manager':
-        # For managers, compare their direct reports
-        direct_reports = User.query.filter_by(manager_id=current_user.id).all()
+        # For managers, compare everyone in their reporting subtree: each
+        # employee's latest review score and goal completion, read for the
+        # whole team at once
+        employee_ids = team_member_ids(current_user)
+        latest = select(
+            Review.reviewee_id,
+            Review.overall_rating,
+            func.row_number().over(
+                partition_by=Review.reviewee_id,
+                order_by=(Review.created_at.desc(), Review.id.desc())
+            ).label('position')
+        ).where(Review.reviewee_id.in_(employee_ids)).subquery()
+        
+        team, latest_ratings, goal_counts = await async_db.gather(
+            select(User.id, User.first_name, User.last_name, Department.name)
+            .outerjoin(Department, User.department_id == Department.id)
+            .where(User.id.in_(employee_ids))
+            .order_by(User.id),
+            select(latest.c.reviewee_id, latest.c.overall_rating).where(latest.c.position == 1),
+            select(
+                Goal.employee_id,
+                func.count(Goal.id),
+                func.sum(case((Goal.status == 'completed', 1), else_=0))
+            ).where(Goal.employee_id.in_(employee_ids)).group_by(Goal.employee_id)
+        )
+        latest_ratings = dict(latest_ratings.all())
+        goal_counts = {employee_id: (total, completed) for employee_id, total, completed in goal_counts}
         
         team_data = []
-        for employee in direct_reports:
-            # Get employee's latest review scores
-            latest_review = Review.query.filter_by(
-                reviewee_id=employee.id
-            ).order_by(Review.created_at.desc()).first()
-            
-            # Get goal completion rate
-            total_goals = Goal.query.filter_by(employee_id=employee.id).count()
-            completed_goals = Goal.query.filter_by(
-                employee_id=employee.id, status='completed'
-            ).count()
-            
+        for employee_id, first_name, last_name, department in team:
+            total_goals, completed_goals = goal_counts.get(employee_id, (0, 0))
             completion_rate = (completed_goals / total_goals * 100) if total_goals > 0 else 0
             
             team_data.append({
-                'employee_name': f"{employee.first_name} {employee.last_name}",
-                'department': employee.department,
-                'overall_rating': latest_review.overall_rating if latest_review else None,
+                'employee_name': f"{first_name} {last_name}",
+                'department': department,
+                'overall_rating': latest_ratings.get(employee_id),
                 'goal_completion_rate': round(completion_rate, 2),
                 'total_goals': total_goals
             })
     else:
         # For admins, compare by department
-        dept_data = db.session.query(
-            User.department,
+        dept_ratings = db.session.query(
+            User.department_id,
             func.avg(Review.overall_rating).label('avg_rating'),
             func.count(func.distinct(User.id)).label('employee_count')
         ).join(Review, User.id == Review.reviewee_id)\
-         .filter(User.is_active == True)\
-         .group_by(User.department).all()
+         .filter(User.is_active == True, User.department_id.isnot(None))\
+         .group_by(User.department_id).subquery()
+        dept_data = db.session.query(
+            Department.name, dept_ratings.c.avg_rating, dept_ratings.c.employee_count
+        ).join(dept_ratings, Department.id == dept_ratings.c.department_id).all()
         
         team_data = []
         for dept, avg_rating, emp_count in dept_data:
-            if dept:  # Skip null departments
-                team_data.append({
-                    'department': dept,
-                    'average_rating': round(float(avg_rating), 2),
-                    'employee_count': emp_count
-                })
+            team_data.append({
+                'department': dept,
+                'average_rating': round(float(avg_rating), 2),
+                'employee_count': emp_count
+            })
     
     return jsonify({'team_data': team_data}), 200
 
 @analytics_bp.route('/skills-gap', methods=['GET'])
 @role_required('admin', 'manager')
 @audit_log('view_skills_gap')
+@use_replica
 def get_skills_gap_analysis(current_user):
     """
     Get skills gap analysis
@@ -211,16 +233,12 @@ def get_skills_gap_analysis(current_user):
       200:
         description: Skills gap analysis
     """
-    if current_user.role == 'manager':
-        direct_reports = User.query.filter_by(manager_id=current_user.id).all()
-        employee_ids = [emp.id for emp in direct_reports]
-    else:
-        employee_ids = [user.id for user in User.query.filter_by(is_active=True).all()]
+    employee_ids = team_member_ids(current_user)
     
     # Get skills with gaps (where current level < target level)
-    skills_gaps = db.session.query(
-        Skill.skill_name,
-        Skill.category,
+    gap_stats = db.session.query(
+        Skill.skill_name_id,
+        Skill.category_id,
         func.avg(Skill.proficiency_level).label('avg_current'),
         func.avg(Skill.target_level).label('avg_target'),
         func.count(Skill.id).label('employee_count')
@@ -229,7 +247,15 @@ def get_skills_gap_analysis(current_user):
             Skill.employee_id.in_(employee_ids),
             Skill.target_level > Skill.proficiency_level
         )
-    ).group_by(Skill.skill_name, Skill.category).all()
+    ).group_by(Skill.skill_name_id, Skill.category_id).subquery()
+    skills_gaps = db.session.query(
+        SkillName.name,
+        SkillCategory.name,
+        gap_stats.c.avg_current,
+        gap_stats.c.avg_target,
+        gap_stats.c.employee_count
+    ).join(gap_stats, SkillName.id == gap_stats.c.skill_name_id)\
+     .outerjoin(SkillCategory, SkillCategory.id == gap_stats.c.category_id).all()
     
     gaps_data = []
     for skill, category, avg_current, avg_target, count in skills_gaps:
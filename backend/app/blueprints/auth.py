@@ -1,9 +1,15 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import (create_access_token, create_refresh_token, jwt_required,
+                                get_jwt_identity, get_jwt)
 from marshmallow import ValidationError
 from app.models import User
 from app.schemas import LoginSchema, UserSchema
 from app.utils.decorators import audit_log
+from app.utils.hashing import hashing, HashingUnavailable
+from app.utils.principal_cache import load_principal
+from app.utils.queries import active_user_by_email
+from app.utils.rate_limit import login_throttle
+from app.utils.revocation import revocation_list
 from app import db
 
 auth_bp = Blueprint('auth', __name__)
@@ -35,18 +41,39 @@ def login():
         description: Login successful
       401:
         description: Invalid credentials
+      429:
+        description: Too many login attempts from this IP or for this email
+      503:
+        description: Password hashing is saturated, retry later
     """
     try:
         schema = LoginSchema()
         data = schema.load(request.json)
         
-        user = User.query.filter_by(email=data['email'], is_active=True).first()
+        # Throttle before the user lookup and password hash, which are the
+        # expensive part of a login attempt
+        retry_after = login_throttle.check(request.remote_addr, data['email'])
+        if retry_after is not None:
+            return jsonify({'message': 'Too many login attempts'}), 429, {'Retry-After': str(retry_after)}
         
-        if user and user.check_password(data['password']):
+        user = active_user_by_email(data['email'])
+        
+        if user and hashing.check_password(user.password_hash, data['password']):
+            if user.password_needs_rehash():
+                # Upgrade the stored hash to the current policy while we
+                # still hold the plaintext; a busy pool just defers it
+                try:
+                    user.password_hash = hashing.hash_password(data['password'])
+                    db.session.commit()
+                except HashingUnavailable:
+                    pass
+            
             access_token = create_access_token(identity=user.id)
+            refresh_token = create_refresh_token(identity=user.id)
             user_schema = UserSchema()
             return jsonify({
                 'access_token': access_token,
+                'refresh_token': refresh_token,
                 'user': user_schema.dump(user)
             }), 200
         
@@ -54,6 +81,49 @@ def login():
     
     except ValidationError as e:
         return jsonify({'errors': e.messages}), 400
+    except HashingUnavailable:
+        return jsonify({'message': 'Login temporarily unavailable, please retry'}), 503, {'Retry-After': '1'}
+
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """
+    Exchange a refresh token for a new access token
+    ---
+    tags:
+      - Authentication
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: New access token
+      401:
+        description: Refresh token invalid, revoked or user inactive
+    """
+    current_user_id = get_jwt_identity()
+    principal = load_principal(current_user_id)
+    
+    if not principal or not principal.is_active:
+        return jsonify({'message': 'User not found or inactive'}), 401
+    
+    return jsonify({'access_token': create_access_token(identity=current_user_id)}), 200
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Revoke the presented access or refresh token
+    ---
+    tags:
+      - Authentication
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Token revoked
+    """
+    revocation_list.revoke(get_jwt())
+    return jsonify({'message': 'Token revoked'}), 200
 
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
@@ -70,7 +140,7 @@ def get_current_user():
         description: User profile
     """
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = db.session.get(User, current_user_id)
     
     if not user or not user.is_active:
         return jsonify({'message': 'User not found'}), 404
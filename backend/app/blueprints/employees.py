@@ -1,15 +1,36 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
-from app.models import User
-from app.schemas import UserSchema, UserCreateSchema
-from app.utils.decorators import role_required, audit_log
+from app.models import User, Goal, Review, Skill, OrgClosure
+from app.schemas import UserSchema, UserCreateSchema, UserUpdateSchema, GoalSchema, ReviewSchema, SkillSchema
+from app.schemas import load_update
+from app.utils.decorators import role_required, audit_log, use_replica
+from app.utils.loading import requested_fields
+from app.utils.records import record_query
+from app.utils.pagination import paginate, page_response
+from app.utils.streaming import wants_ndjson, stream_ndjson
+from app.utils.scopes import (user_scope, goal_scope, review_scope, skill_scope,
+                              user_write_scope, update_scoped)
+from app.utils.queries import get_scoped, email_taken
+from app.utils.includes import Include, requested_includes, load_includes, include_versions
+from app.utils.etags import collection_etag, row_etag, conditional
+from app.utils.principal_cache import principal_cache
+from app.utils.hashing import hashing, HashingUnavailable
 from app import db
 
 employees_bp = Blueprint('employees', __name__)
 
+# Nested resources accepted by GET /api/employees/<id>?include=
+EMPLOYEE_INCLUDES = {
+    'goals': Include(Goal, GoalSchema, goal_scope, Goal.employee_id, ()),
+    'skills': Include(Skill, SkillSchema, skill_scope, Skill.employee_id, ()),
+    'reviews': Include(Review, ReviewSchema, review_scope, Review.reviewee_id, ()),
+    'direct_reports': Include(User, UserSchema, user_scope, User.manager_id, (User.is_active == True,)),
+}
+
 @employees_bp.route('', methods=['GET'])
 @role_required('admin', 'manager')
 @audit_log('list_employees')
+@use_replica
 def get_employees(current_user):
     """
     Get all employees
@@ -18,19 +39,41 @@ def get_employees(current_user):
       - Employees
     security:
       - Bearer: []
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size, capped at PAGE_SIZE_MAX
+      - in: query
+        name: cursor
+        type: string
+        description: Opaque cursor from the previous page's X-Next-Cursor header
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated subset of fields to return
+    produces:
+      - application/json
+      - application/x-ndjson
     responses:
       200:
         description: List of employees
     """
-    if current_user.role == 'manager':
-        # Managers can only see their direct reports
-        employees = User.query.filter_by(manager_id=current_user.id, is_active=True).all()
-    else:
-        # Admins can see all employees
-        employees = User.query.filter_by(is_active=True).all()
-    
-    schema = UserSchema(many=True)
-    return jsonify(schema.dump(employees)), 200
+    # Managers see their reporting subtree, admins see everyone
+    only = requested_fields(UserSchema)
+    query, serialize = record_query(User, UserSchema, only)
+    query = query.filter(
+        user_scope(current_user, include_self=False),
+        User.is_active == True
+    )
+    not_modified = conditional(collection_etag(query, User, current_user, only))
+    if not_modified is not None:
+        return not_modified
+    if wants_ndjson():
+        return stream_ndjson(query, User, serialize)
+    
+    employees, next_cursor = paginate(query, User)
+    return page_response([serialize(row) for row in employees], next_cursor)
 
 @employees_bp.route('', methods=['POST'])
 @role_required('admin')
@@ -59,17 +102,19 @@ def create_employee(current_user):
         description: Employee created
       400:
         description: Validation error
+      503:
+        description: Password hashing is saturated, retry later
     """
     try:
         schema = UserCreateSchema()
         data = schema.load(request.json)
         
         # Check if email already exists
-        if User.query.filter_by(email=data['email']).first():
+        if email_taken(data['email']):
             return jsonify({'message': 'Email already exists'}), 400
         
         user = User(**{k: v for k, v in data.items() if k != 'password'})
-        user.set_password(data['password'])
+        user.password_hash = hashing.hash_password(data['password'])
         
         db.session.add(user)
         db.session.commit()
@@ -79,6 +124,8 @@ def create_employee(current_user):
     
     except ValidationError as e:
         return jsonify({'errors': e.messages}), 400
+    except HashingUnavailable:
+        return jsonify({'message': 'Password hashing unavailable, please retry'}), 503, {'Retry-After': '1'}
 
 @employees_bp.route('/<int:employee_id>', methods=['GET'])
 @role_required('admin', 'manager', 'employee')
@@ -95,27 +142,47 @@ def get_employee(current_user, employee_id):
         name: employee_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated subset of fields to return
+      - in: query
+        name: include
+        type: string
+        description: Comma-separated nested resources (goals, skills, reviews, direct_reports)
     responses:
       200:
         description: Employee details
       404:
         description: Employee not found
     """
-    employee = User.query.get(employee_id)
+    only = requested_fields(UserSchema)
+    includes = requested_includes(EMPLOYEE_INCLUDES)
+    employee, allowed = get_scoped(User, employee_id, user_scope, current_user, only)
     
     if not employee or not employee.is_active:
         return jsonify({'message': 'Employee not found'}), 404
     
-    # Access control
-    if current_user.role == 'employee' and current_user.id != employee_id:
-        return jsonify({'message': 'Access denied'}), 403
-    elif current_user.role == 'manager' and employee.manager_id != current_user.id and current_user.id != employee_id:
+    if not allowed:
         return jsonify({'message': 'Access denied'}), 403
     
-    schema = UserSchema()
-    return jsonify(schema.dump(employee)), 200
+    not_modified = conditional(row_etag(
+        employee, current_user, only,
+        *include_versions(current_user, EMPLOYEE_INCLUDES, includes, [employee.id])
+    ))
+    if not_modified is not None:
+        return not_modified
+    
+    schema = UserSchema(only=only)
+    data = schema.dump(employee)
+    
+    # Nested rows go through the same scopes as their own endpoints
+    for name, by_employee in load_includes(current_user, EMPLOYEE_INCLUDES, includes, [employee.id]).items():
+        data[name] = by_employee.get(employee.id, [])
+    
+    return jsonify(data), 200
 
-@employees_bp.route('/<int:employee_id>', methods=['PUT'])
+@employees_bp.route('/<int:employee_id>', methods=['PUT', 'PATCH'])
 @role_required('admin', 'manager')
 @audit_log('update_employee', 'user')
 def update_employee(current_user, employee_id):
@@ -137,29 +204,32 @@ def update_employee(current_user, employee_id):
       404:
         description: Employee not found
     """
-    employee = User.query.get(employee_id)
-    
-    if not employee:
-        return jsonify({'message': 'Employee not found'}), 404
+    try:
+        data = load_update(UserUpdateSchema, request.method, request.json)
+    except ValidationError as e:
+        return jsonify({'errors': e.messages}), 400
     
-    # Managers can only update their direct reports
-    if current_user.role == 'manager' and employee.manager_id != current_user.id:
-        return jsonify({'message': 'Access denied'}), 403
+    if not data:
+        return jsonify({'message': 'No fields to update'}), 400
     
     try:
-        data = request.json
-        for key, value in data.items():
-            if hasattr(employee, key) and key not in ['id', 'password_hash', 'created_at']:
-                setattr(employee, key, value)
-        
+        employee, found = update_scoped(User, employee_id, user_write_scope(current_user), data, UserSchema)
+        if employee and 'manager_id' in data:
+            OrgClosure.move(db.session.connection(), employee_id, data['manager_id'])
         db.session.commit()
-        
-        schema = UserSchema()
-        return jsonify(schema.dump(employee)), 200
-    
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Update failed'}), 400
+    
+    if not found:
+        return jsonify({'message': 'Employee not found'}), 404
+    
+    if not employee:
+        return jsonify({'message': 'Access denied'}), 403
+    
+    principal_cache.invalidate(employee_id)
+    
+    return jsonify(employee), 200
 
 @employees_bp.route('/<int:employee_id>', methods=['DELETE'])
 @role_required('admin')
@@ -183,12 +253,13 @@ def deactivate_employee(current_user, employee_id):
       404:
         description: Employee not found
     """
-    employee = User.query.get(employee_id)
+    employee = db.session.get(User, employee_id)
     
     if not employee:
         return jsonify({'message': 'Employee not found'}), 404
     
     employee.is_active = False
     db.session.commit()
+    principal_cache.invalidate(employee_id)
     
     return jsonify({'message': 'Employee deactivated successfully'}), 200
\ No newline at end of file
@@ -1,14 +1,34 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
 from app.models import Goal, User
-from app.schemas import GoalSchema, GoalCreateSchema
-from app.utils.decorators import role_required, audit_log
+from app.schemas import GoalSchema, GoalCreateSchema, GoalUpdateSchema, load_update
+from app.utils.decorators import role_required, audit_log, use_replica
+from app.utils.loading import requested_fields
+from app.utils.records import record_query
+from app.utils.pagination import paginate, page_response, sort_order
+from app.utils.filters import filter_query
+from app.utils.streaming import wants_ndjson, stream_ndjson
+from app.utils.scopes import goal_scope, goal_write_scope, update_scoped
+from app.utils.queries import get_scoped
+from app.utils.etags import collection_etag, row_etag, conditional
 from app import db
 
 goals_bp = Blueprint('goals', __name__)
 
+# Query-string filters and sort keys accepted by GET /api/goals
+GOAL_FILTERS = {
+    'status': ('status', 'in'),
+    'category': ('category', 'in'),
+    'employee_id': ('employee_id', 'in'),
+    'manager_approved': ('manager_approved', 'eq'),
+    'target_date_from': ('target_date', 'gte'),
+    'target_date_to': ('target_date', 'lte'),
+}
+GOAL_SORTS = ('created_at', 'updated_at', 'target_date', 'progress', 'title')
+
 @goals_bp.route('', methods=['GET'])
 @role_required('admin', 'manager', 'employee')
+@use_replica
 def get_goals(current_user):
     """
     Get goals based on user role
@@ -17,22 +37,67 @@ def get_goals(current_user):
       - Goals
     security:
       - Bearer: []
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size, capped at PAGE_SIZE_MAX
+      - in: query
+        name: cursor
+        type: string
+        description: Opaque cursor from the previous page's X-Next-Cursor header
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated subset of fields to return
+      - in: query
+        name: status
+        type: string
+        description: Comma-separated statuses (draft, active, completed, cancelled)
+      - in: query
+        name: category
+        type: string
+        description: Comma-separated categories
+      - in: query
+        name: employee_id
+        type: string
+        description: Comma-separated employee IDs
+      - in: query
+        name: manager_approved
+        type: boolean
+      - in: query
+        name: target_date_from
+        type: string
+        format: date
+        description: Earliest target date, inclusive
+      - in: query
+        name: target_date_to
+        type: string
+        format: date
+        description: Latest target date, inclusive
+      - in: query
+        name: sort
+        type: string
+        description: created_at, updated_at, target_date, progress or title; prefix with - for descending
+    produces:
+      - application/json
+      - application/x-ndjson
     responses:
       200:
         description: List of goals
     """
-    if current_user.role == 'admin':
-        goals = Goal.query.all()
-    elif current_user.role == 'manager':
-        # Get goals for direct reports
-        direct_reports = User.query.filter_by(manager_id=current_user.id).all()
-        employee_ids = [emp.id for emp in direct_reports] + [current_user.id]
-        goals = Goal.query.filter(Goal.employee_id.in_(employee_ids)).all()
-    else:
-        goals = Goal.query.filter_by(employee_id=current_user.id).all()
+    only = requested_fields(GoalSchema)
+    sort = sort_order(Goal, GOAL_SORTS)
+    query, serialize = record_query(Goal, GoalSchema, only, extra=(sort[0].key,))
+    query = filter_query(query.filter(goal_scope(current_user)), Goal, GOAL_FILTERS)
+    not_modified = conditional(collection_etag(query, Goal, current_user, only))
+    if not_modified is not None:
+        return not_modified
+    if wants_ndjson():
+        return stream_ndjson(query, Goal, serialize, sort)
     
-    schema = GoalSchema(many=True)
-    return jsonify(schema.dump(goals)), 200
+    goals, next_cursor = paginate(query, Goal, sort)
+    return page_response([serialize(row) for row in goals], next_cursor)
 
 @goals_bp.route('', methods=['POST'])
 @role_required('admin', 'manager', 'employee')
@@ -87,27 +152,31 @@ def get_goal(current_user, goal_id):
         name: goal_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated subset of fields to return
     responses:
       200:
         description: Goal details
     """
-    goal = Goal.query.get(goal_id)
+    only = requested_fields(GoalSchema)
+    goal, allowed = get_scoped(Goal, goal_id, goal_scope, current_user, only)
     
     if not goal:
         return jsonify({'message': 'Goal not found'}), 404
     
-    # Access control
-    if current_user.role == 'employee' and goal.employee_id != current_user.id:
+    if not allowed:
         return jsonify({'message': 'Access denied'}), 403
-    elif current_user.role == 'manager':
-        employee = User.query.get(goal.employee_id)
-        if employee.manager_id != current_user.id and goal.employee_id != current_user.id:
-            return jsonify({'message': 'Access denied'}), 403
     
-    schema = GoalSchema()
+    not_modified = conditional(row_etag(goal, current_user, only))
+    if not_modified is not None:
+        return not_modified
+    
+    schema = GoalSchema(only=only)
     return jsonify(schema.dump(goal)), 200
 
-@goals_bp.route('/<int:goal_id>', methods=['PUT'])
+@goals_bp.route('/<int:goal_id>', methods=['PUT', 'PATCH'])
 @role_required('admin', 'manager', 'employee')
 @audit_log('update_goal', 'goal')
 def update_goal(current_user, goal_id):
@@ -127,33 +196,28 @@ def update_goal(current_user, goal_id):
       200:
         description: Goal updated
     """
-    goal = Goal.query.get(goal_id)
+    try:
+        data = load_update(GoalUpdateSchema, request.method, request.json)
+    except ValidationError as e:
+        return jsonify({'errors': e.messages}), 400
     
-    if not goal:
-        return jsonify({'message': 'Goal not found'}), 404
-    
-    # Access control
-    if current_user.role == 'employee' and goal.employee_id != current_user.id:
-        return jsonify({'message': 'Access denied'}), 403
-    elif current_user.role == 'manager':
-        employee = User.query.get(goal.employee_id)
-        if employee.manager_id != current_user.id and goal.employee_id != current_user.id:
-            return jsonify({'message': 'Access denied'}), 403
+    if not data:
+        return jsonify({'message': 'No fields to update'}), 400
     
     try:
-        data = request.json
-        for key, value in data.items():
-            if hasattr(goal, key) and key not in ['id', 'employee_id', 'created_at']:
-                setattr(goal, key, value)
-        
+        goal, found = update_scoped(Goal, goal_id, goal_write_scope(current_user), data, GoalSchema)
         db.session.commit()
-        
-        schema = GoalSchema()
-        return jsonify(schema.dump(goal)), 200
-    
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Update failed'}), 400
+    
+    if not found:
+        return jsonify({'message': 'Goal not found'}), 404
+    
+    if not goal:
+        return jsonify({'message': 'Access denied'}), 403
+    
+    return jsonify(goal), 200
 
 @goals_bp.route('/<int:goal_id>/approve', methods=['POST'])
 @role_required('manager', 'admin')
@@ -175,14 +239,14 @@ def approve_goal(current_user, goal_id):
       200:
         description: Goal approved
     """
-    goal = Goal.query.get(goal_id)
+    goal = db.session.get(Goal, goal_id)
     
     if not goal:
         return jsonify({'message': 'Goal not found'}), 404
     
     # Only manager of the employee can approve
     if current_user.role == 'manager':
-        employee = User.query.get(goal.employee_id)
+        employee = db.session.get(User, goal.employee_id)
         if employee.manager_id != current_user.id:
             return jsonify({'message': 'Access denied'}), 403
     
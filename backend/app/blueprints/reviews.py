@@ -1,14 +1,34 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
 from app.models import Review, User
-from app.schemas import ReviewSchema, ReviewCreateSchema
-from app.utils.decorators import role_required, audit_log
+from app.schemas import ReviewSchema, ReviewCreateSchema, ReviewUpdateSchema, load_update
+from app.utils.decorators import role_required, audit_log, use_replica
+from app.utils.loading import requested_fields
+from app.utils.records import record_query
+from app.utils.pagination import paginate, page_response
+from app.utils.filters import filter_query
+from app.utils.facets import requested_facets, paginate_with_facets
+from app.utils.streaming import wants_ndjson, stream_ndjson
+from app.utils.scopes import review_scope, review_write_scope, update_scoped
+from app.utils.queries import get_scoped
+from app.utils.etags import collection_etag, row_etag, conditional
 from app import db
 
 reviews_bp = Blueprint('reviews', __name__)
 
+# Query-string filters and facets accepted by GET /api/reviews
+REVIEW_FILTERS = {
+    'review_period': ('review_period', 'in'),
+    'review_type': ('review_type', 'in'),
+    'status': ('status', 'in'),
+    'reviewee_id': ('reviewee_id', 'in'),
+    'reviewer_id': ('reviewer_id', 'in'),
+}
+REVIEW_FACETS = ('review_period', 'review_type', 'status')
+
 @reviews_bp.route('', methods=['GET'])
 @role_required('admin', 'manager', 'employee')
+@use_replica
 def get_reviews(current_user):
     """
     Get reviews based on user role
@@ -17,29 +37,71 @@ def get_reviews(current_user):
       - Reviews
     security:
       - Bearer: []
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size, capped at PAGE_SIZE_MAX
+      - in: query
+        name: cursor
+        type: string
+        description: Opaque cursor from the previous page's X-Next-Cursor header
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated subset of fields to return
+      - in: query
+        name: review_period
+        type: string
+        description: Comma-separated review periods
+      - in: query
+        name: review_type
+        type: string
+        description: Comma-separated review types (self, peer, manager)
+      - in: query
+        name: status
+        type: string
+        description: Comma-separated statuses (draft, submitted, completed)
+      - in: query
+        name: reviewee_id
+        type: string
+        description: Comma-separated reviewee IDs
+      - in: query
+        name: reviewer_id
+        type: string
+        description: Comma-separated reviewer IDs
+      - in: query
+        name: facets
+        type: string
+        description: >
+          Comma-separated columns (review_period, review_type, status) to count
+          across the filtered reviews; the response becomes {items, facets}
+    produces:
+      - application/json
+      - application/x-ndjson
     responses:
       200:
         description: List of reviews
     """
-    if current_user.role == 'admin':
-        reviews = Review.query.all()
-    elif current_user.role == 'manager':
-        # Get reviews for direct reports and reviews given by manager
-        direct_reports = User.query.filter_by(manager_id=current_user.id).all()
-        employee_ids = [emp.id for emp in direct_reports] + [current_user.id]
-        reviews = Review.query.filter(
-            (Review.reviewee_id.in_(employee_ids)) | 
-            (Review.reviewer_id == current_user.id)
-        ).all()
-    else:
-        # Employee can see reviews they've given or received
-        reviews = Review.query.filter(
-            (Review.reviewee_id == current_user.id) | 
-            (Review.reviewer_id == current_user.id)
-        ).all()
-    
-    schema = ReviewSchema(many=True)
-    return jsonify(schema.dump(reviews)), 200
+    only = requested_fields(ReviewSchema)
+    facets = requested_facets(REVIEW_FACETS)
+    query, serialize = record_query(Review, ReviewSchema, only)
+    query = filter_query(query.filter(review_scope(current_user)), Review, REVIEW_FILTERS)
+    not_modified = conditional(collection_etag(query, Review, current_user, only))
+    if not_modified is not None:
+        return not_modified
+    if wants_ndjson():
+        return stream_ndjson(query, Review, serialize)
+    
+    if facets:
+        reviews, next_cursor, counts = paginate_with_facets(query, Review, facets)
+        return page_response({
+            'items': [serialize(row) for row in reviews],
+            'facets': counts
+        }, next_cursor)
+    
+    reviews, next_cursor = paginate(query, Review)
+    return page_response([serialize(row) for row in reviews], next_cursor)
 
 @reviews_bp.route('', methods=['POST'])
 @role_required('admin', 'manager', 'employee')
@@ -69,7 +131,7 @@ def create_review(current_user):
         data = schema.load(request.json)
         
         # Validate review permissions
-        reviewee = User.query.get(data['reviewee_id'])
+        reviewee = db.session.get(User, data['reviewee_id'])
         if not reviewee:
             return jsonify({'message': 'Reviewee not found'}), 404
         
@@ -110,30 +172,31 @@ def get_review(current_user, review_id):
         name: review_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated subset of fields to return
     responses:
       200:
         description: Review details
     """
-    review = Review.query.get(review_id)
+    only = requested_fields(ReviewSchema)
+    review, allowed = get_scoped(Review, review_id, review_scope, current_user, only)
     
     if not review:
         return jsonify({'message': 'Review not found'}), 404
     
-    # Access control
-    if current_user.role == 'employee':
-        if review.reviewer_id != current_user.id and review.reviewee_id != current_user.id:
-            return jsonify({'message': 'Access denied'}), 403
-    elif current_user.role == 'manager':
-        reviewee = User.query.get(review.reviewee_id)
-        if (reviewee.manager_id != current_user.id and 
-            review.reviewer_id != current_user.id and 
-            review.reviewee_id != current_user.id):
-            return jsonify({'message': 'Access denied'}), 403
+    if not allowed:
+        return jsonify({'message': 'Access denied'}), 403
     
-    schema = ReviewSchema()
+    not_modified = conditional(row_etag(review, current_user, only))
+    if not_modified is not None:
+        return not_modified
+    
+    schema = ReviewSchema(only=only)
     return jsonify(schema.dump(review)), 200
 
-@reviews_bp.route('/<int:review_id>', methods=['PUT'])
+@reviews_bp.route('/<int:review_id>', methods=['PUT', 'PATCH'])
 @role_required('admin', 'manager', 'employee')
 @audit_log('update_review', 'review')
 def update_review(current_user, review_id):
@@ -153,29 +216,28 @@ def update_review(current_user, review_id):
       200:
         description: Review updated
     """
-    review = Review.query.get(review_id)
-    
-    if not review:
-        return jsonify({'message': 'Review not found'}), 404
+    try:
+        data = load_update(ReviewUpdateSchema, request.method, request.json)
+    except ValidationError as e:
+        return jsonify({'errors': e.messages}), 400
     
-    # Only the reviewer can update their review
-    if review.reviewer_id != current_user.id and current_user.role != 'admin':
-        return jsonify({'message': 'Access denied'}), 403
+    if not data:
+        return jsonify({'message': 'No fields to update'}), 400
     
     try:
-        data = request.json
-        for key, value in data.items():
-            if hasattr(review, key) and key not in ['id', 'reviewer_id', 'reviewee_id', 'created_at']:
-                setattr(review, key, value)
-        
+        review, found = update_scoped(Review, review_id, review_write_scope(current_user), data, ReviewSchema)
         db.session.commit()
-        
-        schema = ReviewSchema()
-        return jsonify(schema.dump(review)), 200
-    
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Update failed'}), 400
+    
+    if not found:
+        return jsonify({'message': 'Review not found'}), 404
+    
+    if not review:
+        return jsonify({'message': 'Access denied'}), 403
+    
+    return jsonify(review), 200
 
 @reviews_bp.route('/<int:review_id>/submit', methods=['POST'])
 @role_required('admin', 'manager', 'employee')
@@ -197,7 +259,7 @@ def submit_review(current_user, review_id):
       200:
         description: Review submitted
     """
-    review = Review.query.get(review_id)
+    review = db.session.get(Review, review_id)
     
     if not review:
         return jsonify({'message': 'Review not found'}), 404
@@ -1,14 +1,22 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
-from app.models import Skill, User
-from app.schemas import SkillSchema, SkillCreateSchema
-from app.utils.decorators import role_required, audit_log
+from app.models import Skill
+from app.schemas import SkillSchema, SkillCreateSchema, SkillUpdateSchema, load_update
+from app.utils.decorators import role_required, audit_log, use_replica
+from app.utils.loading import requested_fields
+from app.utils.records import record_query
+from app.utils.pagination import paginate, page_response
+from app.utils.streaming import wants_ndjson, stream_ndjson
+from app.utils.scopes import skill_scope, skill_write_scope, update_scoped
+from app.utils.queries import get_scoped
+from app.utils.etags import collection_etag, row_etag, conditional
 from app import db
 
 skills_bp = Blueprint('skills', __name__)
 
 @skills_bp.route('', methods=['GET'])
 @role_required('admin', 'manager', 'employee')
+@use_replica
 def get_skills(current_user):
     """
     Get skills based on user role
@@ -17,22 +25,37 @@ def get_skills(current_user):
       - Skills
     security:
       - Bearer: []
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Page size, capped at PAGE_SIZE_MAX
+      - in: query
+        name: cursor
+        type: string
+        description: Opaque cursor from the previous page's X-Next-Cursor header
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated subset of fields to return
+    produces:
+      - application/json
+      - application/x-ndjson
     responses:
       200:
         description: List of skills
     """
-    if current_user.role == 'admin':
-        skills = Skill.query.all()
-    elif current_user.role == 'manager':
-        # Get skills for direct reports
-        direct_reports = User.query.filter_by(manager_id=current_user.id).all()
-        employee_ids = [emp.id for emp in direct_reports] + [current_user.id]
-        skills = Skill.query.filter(Skill.employee_id.in_(employee_ids)).all()
-    else:
-        skills = Skill.query.filter_by(employee_id=current_user.id).all()
+    only = requested_fields(SkillSchema)
+    query, serialize = record_query(Skill, SkillSchema, only)
+    query = query.filter(skill_scope(current_user))
+    not_modified = conditional(collection_etag(query, Skill, current_user, only))
+    if not_modified is not None:
+        return not_modified
+    if wants_ndjson():
+        return stream_ndjson(query, Skill, serialize)
     
-    schema = SkillSchema(many=True)
-    return jsonify(schema.dump(skills)), 200
+    skills, next_cursor = paginate(query, Skill)
+    return page_response([serialize(row) for row in skills], next_cursor)
 
 @skills_bp.route('', methods=['POST'])
 @role_required('admin', 'manager', 'employee')
@@ -88,27 +111,31 @@ def get_skill(current_user, skill_id):
         name: skill_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated subset of fields to return
     responses:
       200:
         description: Skill details
     """
-    skill = Skill.query.get(skill_id)
+    only = requested_fields(SkillSchema)
+    skill, allowed = get_scoped(Skill, skill_id, skill_scope, current_user, only)
     
     if not skill:
         return jsonify({'message': 'Skill not found'}), 404
     
-    # Access control
-    if current_user.role == 'employee' and skill.employee_id != current_user.id:
+    if not allowed:
         return jsonify({'message': 'Access denied'}), 403
-    elif current_user.role == 'manager':
-        employee = User.query.get(skill.employee_id)
-        if employee.manager_id != current_user.id and skill.employee_id != current_user.id:
-            return jsonify({'message': 'Access denied'}), 403
     
-    schema = SkillSchema()
+    not_modified = conditional(row_etag(skill, current_user, only))
+    if not_modified is not None:
+        return not_modified
+    
+    schema = SkillSchema(only=only)
     return jsonify(schema.dump(skill)), 200
 
-@skills_bp.route('/<int:skill_id>', methods=['PUT'])
+@skills_bp.route('/<int:skill_id>', methods=['PUT', 'PATCH'])
 @role_required('admin', 'manager', 'employee')
 @audit_log('update_skill', 'skill')
 def update_skill(current_user, skill_id):
@@ -128,30 +155,25 @@ def update_skill(current_user, skill_id):
       200:
         description: Skill updated
     """
-    skill = Skill.query.get(skill_id)
-    
-    if not skill:
-        return jsonify({'message': 'Skill not found'}), 404
+    try:
+        data = load_update(SkillUpdateSchema, request.method, request.json)
+    except ValidationError as e:
+        return jsonify({'errors': e.messages}), 400
     
-    # Access control
-    if current_user.role == 'employee' and skill.employee_id != current_user.id:
-        return jsonify({'message': 'Access denied'}), 403
-    elif current_user.role == 'manager':
-        employee = User.query.get(skill.employee_id)
-        if employee.manager_id != current_user.id and skill.employee_id != current_user.id:
-            return jsonify({'message': 'Access denied'}), 403
+    if not data:
+        return jsonify({'message': 'No fields to update'}), 400
     
     try:
-        data = request.json
-        for key, value in data.items():
-            if hasattr(skill, key) and key not in ['id', 'employee_id', 'created_at']:
-                setattr(skill, key, value)
-        
+        skill, found = update_scoped(Skill, skill_id, skill_write_scope(current_user), data, SkillSchema)
         db.session.commit()
-        
-        schema = SkillSchema()
-        return jsonify(schema.dump(skill)), 200
-    
     except Exception as e:
         db.session.rollback()
-        return jsonify({'message': 'Update failed'}), 400
\ No newline at end of file
+        return jsonify({'message': 'Update failed'}), 400
+    
+    if not found:
+        return jsonify({'message': 'Skill not found'}), 404
+    
+    if not skill:
+        return jsonify({'message': 'Access denied'}), 403
+    
+    return jsonify(skill), 200
\ No newline at end of file
@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify
+from app.utils.decorators import role_required
+from app.utils.sync import changes
+
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('', methods=['GET'])
+@role_required('admin', 'manager', 'employee')
+def get_changes(current_user):
+    """
+    Get goals, reviews, skills and employees changed since a sync token
+    ---
+    tags:
+      - Sync
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: since
+        type: string
+        description: Token from the previous response; omit for the initial download
+    responses:
+      200:
+        description: >
+          Changed rows per resource, IDs deleted or deactivated per resource
+          under "deleted", the token for the next call and has_more
+      400:
+        description: Invalid sync token
+      410:
+        description: Token too old; sync again without since
+    """
+    # Not routed to the replica: a lagging copy could let the token move
+    # past rows it has not received yet
+    return jsonify(changes(current_user, request.args.get('since'))), 200
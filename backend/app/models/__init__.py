@@ -1,7 +1,74 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, select, literal, exists, and_, true
+from sqlalchemy.exc import IntegrityError
 from app import db
+from app.utils import passwords
+
+class LookupMixin:
+    """Dictionary-encoded string value: one row per distinct name.
+
+    Rows referencing a lookup store its small integer ID, so analytics group
+    on integers instead of free text. Names are matched on a normalized key
+    (whitespace collapsed, case-folded), so "Engineering " and "engineering"
+    share one ID and keep the spelling first stored.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    key = db.Column(db.String(100), nullable=False, unique=True)
+    
+    @staticmethod
+    def normalize(name):
+        return ' '.join(name.split()).casefold()
+    
+    @classmethod
+    def resolve(cls, name):
+        """The row for name, created if new; None for a blank name."""
+        if name is None:
+            return None
+        display = ' '.join(name.split())
+        if not display:
+            return None
+        key = display.casefold()
+        
+        row = cls.query.filter_by(key=key).first()
+        if row is None:
+            row = cls(name=display, key=key)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(row)
+            except IntegrityError:
+                # Another request added the same name first
+                row = cls.query.filter_by(key=key).one()
+        return row
+    
+    @classmethod
+    def id_for(cls, name):
+        row = cls.resolve(name)
+        return row.id if row is not None else None
+
+class Department(LookupMixin, db.Model):
+    __tablename__ = 'departments'
+
+class GoalCategory(LookupMixin, db.Model):
+    __tablename__ = 'goal_categories'
+
+class SkillCategory(LookupMixin, db.Model):
+    __tablename__ = 'skill_categories'
+
+class SkillName(LookupMixin, db.Model):
+    __tablename__ = 'skill_names'
+
+def lookup_name(relationship, lookup):
+    """Read and write a lookup relationship by name, e.g. user.department = 'IT'."""
+    def get_name(self):
+        row = getattr(self, relationship)
+        return row.name if row is not None else None
+    
+    def set_name(self, name):
+        setattr(self, relationship, lookup.resolve(name))
+    
+    return property(get_name, set_name)
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -12,7 +79,7 @@ class User(db.Model):
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
     role = db.Column(db.Enum('admin', 'manager', 'employee', name='user_roles'), nullable=False)
-    department = db.Column(db.String(100))
+    department_id = db.Column(db.Integer, db.ForeignKey('departments.id'))
     position = db.Column(db.String(100))
     manager_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     hire_date = db.Column(db.Date)
@@ -25,12 +92,138 @@ class User(db.Model):
     goals = db.relationship('Goal', backref='employee', lazy=True)
     reviews_given = db.relationship('Review', foreign_keys='Review.reviewer_id', backref='reviewer')
     reviews_received = db.relationship('Review', foreign_keys='Review.reviewee_id', backref='reviewee')
+    department_ref = db.relationship('Department')
+    
+    department = lookup_name('department_ref', Department)
+    
+    __table_args__ = (
+        db.Index('ix_users_manager_id_is_active', 'manager_id', 'is_active'),
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+        db.Index('ix_users_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_users_department_id', 'department_id'),
+    )
+    
+    # Password hashers by scheme name; see app.utils.passwords
+    hashers = passwords.HASHERS
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        scheme, params = passwords.current_policy()
+        self.password_hash = passwords.encode_password(password, scheme, params)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return passwords.verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return passwords.needs_rehash(self.password_hash)
+
+class OrgClosure(db.Model):
+    """Ancestor index over User.manager_id.
+
+    Holds one row per (ancestor, descendant) pair in the reporting tree,
+    including each user's depth-0 row for themselves, so "everyone under
+    X" is a single indexed lookup instead of a recursive walk. Rows are
+    maintained by the User insert/update listeners below.
+    """
+    __tablename__ = 'org_closure'
+    
+    ancestor_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    descendant_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True, index=True)
+    depth = db.Column(db.Integer, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_org_closure_ancestor_depth', 'ancestor_id', 'depth'),
+    )
+    
+    @classmethod
+    def subtree_ids(cls, ancestor_id, include_self=False):
+        """SELECT of the user IDs reporting (transitively) to ancestor_id."""
+        query = select(cls.descendant_id).where(cls.ancestor_id == ancestor_id)
+        if not include_self:
+            query = query.where(cls.depth > 0)
+        return query
+    
+    @classmethod
+    def contains(cls, ancestor_id, descendant_id):
+        """True if descendant_id is ancestor_id or reports to them at any depth."""
+        return db.session.query(exists().where(and_(
+            cls.ancestor_id == ancestor_id, cls.descendant_id == descendant_id
+        ))).scalar()
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute the whole table from users.manager_id."""
+        closure = cls.__table__
+        users = User.__table__
+        db.session.execute(closure.delete())
+        db.session.execute(closure.insert().from_select(
+            ['ancestor_id', 'descendant_id', 'depth'],
+            select(users.c.id, users.c.id, literal(0))
+        ))
+        depth = 0
+        while True:
+            result = db.session.execute(closure.insert().from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(closure.c.ancestor_id, users.c.id, literal(depth + 1))
+                .join(users, users.c.manager_id == closure.c.descendant_id)
+                .where(closure.c.depth == depth)
+            ))
+            if not result.rowcount:
+                break
+            depth += 1
+        db.session.commit()
+    
+    @classmethod
+    def move(cls, connection, user_id, manager_id):
+        """Re-parent user_id's whole subtree under manager_id (None for the root).
+
+        Raises ValueError if manager_id is user_id or one of their reports.
+        """
+        closure = cls.__table__
+        if manager_id is not None:
+            cycle = connection.execute(select(closure.c.depth).where(and_(
+                closure.c.ancestor_id == user_id,
+                closure.c.descendant_id == manager_id
+            ))).first()
+            if cycle is not None:
+                raise ValueError('A user cannot report to themselves or their own reports')
+    
+        subtree = select(closure.c.descendant_id).where(closure.c.ancestor_id == user_id)
+        old_ancestors = select(closure.c.ancestor_id).where(and_(
+            closure.c.descendant_id == user_id, closure.c.ancestor_id != user_id
+        ))
+        connection.execute(closure.delete().where(and_(
+            closure.c.descendant_id.in_(subtree),
+            closure.c.ancestor_id.in_(old_ancestors)
+        )))
+    
+        if manager_id is not None:
+            above = closure.alias('above')
+            below = closure.alias('below')
+            connection.execute(closure.insert().from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+                .select_from(above.join(below, true()))
+                .where(and_(above.c.descendant_id == manager_id, below.c.ancestor_id == user_id))
+            ))
+
+@event.listens_for(User, 'after_insert')
+def _add_to_org_closure(mapper, connection, target):
+    closure = OrgClosure.__table__
+    connection.execute(closure.insert().values(
+        ancestor_id=target.id, descendant_id=target.id, depth=0
+    ))
+    if target.manager_id is not None:
+        connection.execute(closure.insert().from_select(
+            ['ancestor_id', 'descendant_id', 'depth'],
+            select(closure.c.ancestor_id, literal(target.id), closure.c.depth + 1)
+            .where(closure.c.descendant_id == target.manager_id)
+        ))
+
+@event.listens_for(User, 'after_update')
+def _move_in_org_closure(mapper, connection, target):
+    history = db.inspect(target).attrs.manager_id.history
+    if history.has_changes():
+        OrgClosure.move(connection, target.id, target.manager_id)
 
 class Goal(db.Model):
     __tablename__ = 'goals'
@@ -39,13 +232,26 @@ class Goal(db.Model):
     employee_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    category = db.Column(db.String(50))
+    category_id = db.Column(db.Integer, db.ForeignKey('goal_categories.id'))
     target_date = db.Column(db.Date)
     status = db.Column(db.Enum('draft', 'active', 'completed', 'cancelled', name='goal_status'), default='draft')
     progress = db.Column(db.Integer, default=0)
     manager_approved = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    category_ref = db.relationship('GoalCategory')
+    
+    category = lookup_name('category_ref', GoalCategory)
+    
+    __table_args__ = (
+        db.Index('ix_goals_employee_id_status', 'employee_id', 'status'),
+        db.Index('ix_goals_created_at_id', 'created_at', 'id'),
+        db.Index('ix_goals_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_goals_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_goals_target_date_id', 'target_date', 'id'),
+        db.Index('ix_goals_category_id', 'category_id'),
+    )
 
 class Review(db.Model):
     __tablename__ = 'reviews'
@@ -66,20 +272,41 @@ class Review(db.Model):
     status = db.Column(db.Enum('draft', 'submitted', 'completed', name='review_status'), default='draft')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_reviews_reviewee_id_created_at', 'reviewee_id', 'created_at'),
+        db.Index('ix_reviews_reviewer_id', 'reviewer_id'),
+        db.Index('ix_reviews_created_at_id', 'created_at', 'id'),
+        db.Index('ix_reviews_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_reviews_review_period_created_at_id', 'review_period', 'created_at', 'id'),
+    )
 
 class Skill(db.Model):
     __tablename__ = 'skills'
     
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    skill_name = db.Column(db.String(100), nullable=False)
+    skill_name_id = db.Column(db.Integer, db.ForeignKey('skill_names.id'), nullable=False)
     proficiency_level = db.Column(db.Integer)  # 1-5 scale
-    category = db.Column(db.String(50))
+    category_id = db.Column(db.Integer, db.ForeignKey('skill_categories.id'))
     last_assessed = db.Column(db.Date)
     target_level = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     employee = db.relationship('User', backref='skills')
+    skill_name_ref = db.relationship('SkillName')
+    category_ref = db.relationship('SkillCategory')
+    
+    skill_name = lookup_name('skill_name_ref', SkillName)
+    category = lookup_name('category_ref', SkillCategory)
+    
+    __table_args__ = (
+        db.Index('ix_skills_employee_id', 'employee_id'),
+        db.Index('ix_skills_skill_name_id_category_id', 'skill_name_id', 'category_id'),
+        db.Index('ix_skills_created_at_id', 'created_at', 'id'),
+        db.Index('ix_skills_updated_at_id', 'updated_at', 'id'),
+    )
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
@@ -93,4 +320,54 @@ class AuditLog(db.Model):
     ip_address = db.Column(db.String(45))
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
-    user = db.relationship('User', backref='audit_logs')
\ No newline at end of file
+    user = db.relationship('User', backref='audit_logs')
+    
+    __table_args__ = (
+        db.Index('ix_audit_logs_timestamp', 'timestamp'),
+    )
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    token_type = db.Column(db.String(10), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    expires_at = db.Column(db.DateTime, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Tombstone(db.Model):
+    """A deleted row, kept for the /api/sync change feed.
+
+    Written by the after_delete listeners below. The deleted row's owner
+    (and a review's reviewer) are kept so the feed can apply the same scope
+    as the row's own endpoint once the row itself is gone.
+    """
+    __tablename__ = 'tombstones'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resource_type = db.Column(db.String(20), nullable=False)
+    resource_id = db.Column(db.Integer, nullable=False)
+    employee_id = db.Column(db.Integer)
+    reviewer_id = db.Column(db.Integer)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_tombstones_deleted_at_id', 'deleted_at', 'id'),
+    )
+
+def _record_tombstone(resource_type, employee_key, reviewer_key=None):
+    def after_delete(mapper, connection, target):
+        connection.execute(Tombstone.__table__.insert().values(
+            resource_type=resource_type,
+            resource_id=target.id,
+            employee_id=getattr(target, employee_key),
+            reviewer_id=getattr(target, reviewer_key) if reviewer_key else None,
+            deleted_at=datetime.utcnow()
+        ))
+    return after_delete
+
+event.listen(User, 'after_delete', _record_tombstone('employees', 'id'))
+event.listen(Goal, 'after_delete', _record_tombstone('goals', 'employee_id'))
+event.listen(Review, 'after_delete', _record_tombstone('reviews', 'reviewee_id', 'reviewer_id'))
+event.listen(Skill, 'after_delete', _record_tombstone('skills', 'employee_id'))
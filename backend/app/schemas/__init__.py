@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate, post_load
+from marshmallow import Schema, fields, validate, post_load, EXCLUDE
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 from app.models import User, Goal, Review, Skill
 
@@ -8,6 +8,7 @@ class UserSchema(SQLAlchemyAutoSchema):
         load_instance = True
         exclude = ('password_hash',)
     
+    department = fields.Str()
     password = fields.Str(load_only=True, validate=validate.Length(min=6))
     full_name = fields.Method('get_full_name')
     
@@ -25,6 +26,43 @@ class UserCreateSchema(Schema):
     manager_id = fields.Int()
     hire_date = fields.Date()
 
+class ClearableMixin:
+    """Lets an update schema set the fields in `clearable` back to null.
+
+    They are the fields backed by nullable columns. Create schemas leave
+    them out instead.
+    """
+    clearable = ()
+    
+    def on_bind_field(self, field_name, field_obj):
+        # Fields are copied per schema instance, so this does not leak
+        # into the create schema
+        if field_name in self.clearable:
+            field_obj.allow_none = True
+
+def load_update(schema_cls, method, data):
+    """Load a PATCH or PUT body with one of the update schemas.
+
+    PATCH is strict: unknown and read-only keys are a 400. PUT keeps
+    accepting what existing clients send, a record echoed from a GET or an
+    edit form: keys the schema cannot write (id, timestamps, names,
+    employee_id, password) are ignored, and an empty string clears a
+    clearable field, as an empty form input means.
+    """
+    if method != 'PUT':
+        return schema_cls(partial=True).load(data)
+    if isinstance(data, dict):
+        data = {key: None if value == '' and key in schema_cls.clearable else value
+                for key, value in data.items()}
+    return schema_cls(partial=True, unknown=EXCLUDE).load(data)
+
+class UserUpdateSchema(ClearableMixin, UserCreateSchema):
+    class Meta:
+        exclude = ('password',)
+    
+    clearable = ('department', 'position', 'manager_id', 'hire_date')
+    is_active = fields.Bool()
+
 class LoginSchema(Schema):
     email = fields.Email(required=True)
     password = fields.Str(required=True)
@@ -34,6 +72,7 @@ class GoalSchema(SQLAlchemyAutoSchema):
         model = Goal
         load_instance = True
     
+    category = fields.Str()
     employee_name = fields.Method('get_employee_name')
     
     def get_employee_name(self, obj):
@@ -47,6 +86,10 @@ class GoalCreateSchema(Schema):
     status = fields.Str(validate=validate.OneOf(['draft', 'active', 'completed', 'cancelled']))
     progress = fields.Int(validate=validate.Range(min=0, max=100))
 
+class GoalUpdateSchema(ClearableMixin, GoalCreateSchema):
+    # manager_approved is only set through POST /goals/<id>/approve
+    clearable = ('description', 'category', 'target_date')
+
 class ReviewSchema(SQLAlchemyAutoSchema):
     class Meta:
         model = Review
@@ -74,13 +117,28 @@ class ReviewCreateSchema(Schema):
     strengths = fields.Str()
     areas_for_improvement = fields.Str()
 
+class ReviewUpdateSchema(ClearableMixin, ReviewCreateSchema):
+    class Meta:
+        exclude = ('reviewee_id',)
+    
+    clearable = ('review_period', 'overall_rating', 'technical_skills', 'communication', 'leadership',
+                 'teamwork', 'comments', 'strengths', 'areas_for_improvement')
+    status = fields.Str(validate=validate.OneOf(['draft', 'submitted', 'completed']))
+
 class SkillSchema(SQLAlchemyAutoSchema):
     class Meta:
         model = Skill
         load_instance = True
+    
+    skill_name = fields.Str()
+    category = fields.Str()
 
 class SkillCreateSchema(Schema):
     skill_name = fields.Str(required=True, validate=validate.Length(min=1, max=100))
     proficiency_level = fields.Int(validate=validate.Range(min=1, max=5))
     category = fields.Str(validate=validate.Length(max=50))
-    target_level = fields.Int(validate=validate.Range(min=1, max=5))
\ No newline at end of file
+    target_level = fields.Int(validate=validate.Range(min=1, max=5))
+
+class SkillUpdateSchema(ClearableMixin, SkillCreateSchema):
+    clearable = ('proficiency_level', 'category', 'last_assessed', 'target_level')
+    last_assessed = fields.Date()
@@ -0,0 +1,134 @@
+import asyncio
+import importlib.util
+import threading
+from functools import partial
+from flask import g
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from app.utils.engine import sqlite_pragmas, _apply_pragmas
+from app.utils.replica import REPLICA
+
+# Drivers for the async engines, by backend. Both are optional: without
+# them (or for an in-memory SQLite database, which a second engine cannot
+# share) gather() runs its statements one after another on the request's
+# session instead.
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg'}
+
+
+def async_url(uri):
+    """The async-driver URL for uri, or None if it has no usable async driver."""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None or importlib.util.find_spec(driver) is None:
+        return None
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        return None
+    return url.set(drivername=f'{backend}+{driver}')
+
+
+class AsyncDatabase:
+    """Runs independent read statements concurrently for async views.
+
+    Flask runs each async view in a fresh event loop, and pooled async
+    connections cannot move between loops. The async engines therefore
+    live on one long-lived loop in a background thread; gather() hands its
+    statements to that loop, where each runs on its own pooled connection,
+    and awaits the results. A view that needs six aggregates pays for
+    roughly one database round trip instead of six.
+
+    Statements go to the replica bind when the request was routed there
+    (see use_replica) and an async engine exists for it.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._db = None
+        self._engines = {}
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        app.config.setdefault('ASYNC_DB_ENABLED', True)
+        app.config.setdefault('ASYNC_DB_POOL_SIZE', 7)
+        app.config.setdefault('ASYNC_DB_MAX_OVERFLOW', 7)
+
+        self.shutdown()
+        self._app = app
+        self._db = db
+        app.extensions['async_db'] = self
+        if not app.config['ASYNC_DB_ENABLED']:
+            return
+
+        from sqlalchemy.ext.asyncio import create_async_engine
+        uris = {None: app.config['SQLALCHEMY_DATABASE_URI']}
+        uris.update(app.config.get('SQLALCHEMY_BINDS') or {})
+        for bind_key, uri in uris.items():
+            url = async_url(uri)
+            if url is None:
+                continue
+            options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+            # A pool of its own, sized for gather() (one connection per
+            # statement) rather than copied from the sync engine, which
+            # would double the connections a worker can hold
+            options['pool_size'] = app.config['ASYNC_DB_POOL_SIZE']
+            options['max_overflow'] = app.config['ASYNC_DB_MAX_OVERFLOW']
+            engine = create_async_engine(url, **options)
+            if url.get_backend_name() == 'sqlite':
+                event.listen(engine.sync_engine, 'connect',
+                             partial(_apply_pragmas, sqlite_pragmas(app.config)))
+            self._engines[bind_key] = engine
+            app.logger.info('Async engine %s: %s', bind_key or 'default', url.drivername)
+
+    @property
+    def enabled(self):
+        return None in self._engines
+
+    async def gather(self, *statements):
+        """Execute statements concurrently and return their buffered results, in order."""
+        engine = None
+        if g.get('read_replica'):
+            engine = self._engines.get(REPLICA)
+        if engine is None:
+            engine = self._engines.get(None)
+        if engine is None:
+            session = self._db.session
+            return [session.execute(statement).freeze()() for statement in statements]
+
+        future = asyncio.run_coroutine_threadsafe(self._execute_all(engine, statements),
+                                                  self._running_loop())
+        return await asyncio.wrap_future(future)
+
+    async def _execute_all(self, engine, statements):
+        async def execute(statement):
+            async with engine.connect() as connection:
+                # Results from AsyncConnection.execute are already buffered
+                return await connection.execute(statement)
+        return await asyncio.gather(*(execute(statement) for statement in statements))
+
+    def _running_loop(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self._loop
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name='async-db', daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def shutdown(self, timeout=5.0):
+        """Close pooled connections and stop the loop thread."""
+        engines, self._engines = self._engines, {}
+        thread, loop = self._thread, self._loop
+        if thread is not None and thread.is_alive():
+            for engine in engines.values():
+                asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result(timeout)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            loop.close()
+        self._thread = self._loop = None
+
+
+async_db = AsyncDatabase()
@@ -0,0 +1,197 @@
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import has_app_context
+from app import db
+from app.models import AuditLog
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Moves audit log inserts off the request path.
+
+    Audited views enqueue plain dicts; a background thread drains the queue
+    and writes each batch with a single executemany INSERT, either when
+    AUDIT_BATCH_SIZE events are waiting or every AUDIT_FLUSH_INTERVAL
+    seconds. The queue is bounded: when it is full new events are dropped
+    and counted rather than blocking the request. The writer thread logs a
+    warning with the counters (see stats()) at most once per flush interval
+    while events are being dropped or failing to write.
+
+    With AUDIT_LOG_ASYNC disabled (e.g. in tests) events are written
+    synchronously, one batch per event.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._reported = (0, 0)
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        app.config.setdefault('AUDIT_LOG_ASYNC', True)
+        app.config.setdefault('AUDIT_QUEUE_SIZE', 10000)
+        app.config.setdefault('AUDIT_BATCH_SIZE', 500)
+        app.config.setdefault('AUDIT_FLUSH_INTERVAL', 1.0)
+
+        self.shutdown()
+        self._app = app
+        self._queue = queue.Queue(maxsize=app.config['AUDIT_QUEUE_SIZE'])
+        self.dropped = self.written = self.failed = 0
+        self._reported = (0, 0)
+        app.extensions['audit_writer'] = self
+
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def enqueue(self, user_id, action, resource_type=None, resource_id=None,
+                ip_address=None, details=None):
+        event = {
+            'user_id': user_id,
+            'action': action,
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'ip_address': ip_address,
+            'details': details,
+            'timestamp': datetime.utcnow(),
+        }
+
+        if not self._app.config['AUDIT_LOG_ASYNC']:
+            self._write([event])
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def stats(self):
+        return {
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'queue_capacity': self._queue.maxsize if self._queue else 0,
+            'dropped': self.dropped,
+            'written': self.written,
+            'failed': self.failed,
+            'running': bool(self._thread and self._thread.is_alive()),
+        }
+
+    def flush(self):
+        """Write everything currently queued from the calling thread."""
+        batch = []
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is not _STOP:
+                batch.append(event)
+        for start in range(0, len(batch), self._app.config['AUDIT_BATCH_SIZE']):
+            self._write(batch[start:start + self._app.config['AUDIT_BATCH_SIZE']])
+
+    def shutdown(self, timeout=5.0):
+        """Stop the writer thread and flush whatever is still queued."""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        self._thread = None
+        if self._queue is not None:
+            self.flush()
+            self.report()
+
+    def report(self):
+        """Log a warning if events were dropped or failed since the last report."""
+        with self._lock:
+            dropped, failed = self.dropped, self.failed
+            last_dropped, last_failed = self._reported
+            if (dropped, failed) == self._reported:
+                return
+            self._reported = (dropped, failed)
+        stats = self.stats()
+        self._app.logger.warning(
+            'Audit log lost events: %d dropped (queue full), %d failed to write '
+            '(%d and %d since start); queue %d/%d',
+            dropped - last_dropped, failed - last_failed, dropped, failed,
+            stats['queue_depth'], stats['queue_capacity']
+        )
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='audit-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        batch_size = self._app.config['AUDIT_BATCH_SIZE']
+        interval = self._app.config['AUDIT_FLUSH_INTERVAL']
+
+        next_report = time.monotonic() + interval
+        while True:
+            if time.monotonic() >= next_report:
+                self.report()
+                next_report = time.monotonic() + interval
+            try:
+                event = self._queue.get(timeout=interval)
+            except queue.Empty:
+                continue
+            if event is _STOP:
+                return
+
+            batch = [event]
+            stop = False
+            deadline = time.monotonic() + interval
+            while len(batch) < batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if event is _STOP:
+                    stop = True
+                    break
+                batch.append(event)
+
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        if not batch:
+            return
+        if has_app_context():
+            self._insert(batch)
+        else:
+            with self._app.app_context():
+                self._insert(batch)
+
+    def _insert(self, batch):
+        try:
+            db.session.execute(AuditLog.__table__.insert(), batch)
+            db.session.commit()
+            with self._lock:
+                self.written += len(batch)
+        except Exception as e:
+            db.session.rollback()
+            with self._lock:
+                self.failed += len(batch)
+            print(f"Audit logging failed: {e}")
+
+
+audit_writer = AuditWriter()
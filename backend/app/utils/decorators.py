@@ -1,8 +1,9 @@
 from functools import wraps
-from flask import jsonify, request
+from flask import current_app, g, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import User, AuditLog
-from app import db
+from app.utils.audit_writer import audit_writer
+from app.utils.principal_cache import load_principal
+from app.utils.replica import replica_router
 
 def role_required(*allowed_roles):
     def decorator(f):
@@ -10,7 +11,7 @@ def role_required(*allowed_roles):
         @jwt_required()
         def decorated_function(*args, **kwargs):
             current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
+            user = load_principal(current_user_id)
             
             if not user or not user.is_active:
                 return jsonify({'message': 'User not found or inactive'}), 401
@@ -18,28 +19,38 @@ def role_required(*allowed_roles):
             if user.role not in allowed_roles:
                 return jsonify({'message': 'Insufficient permissions'}), 403
             
-            return f(current_user=user, *args, **kwargs)
+            return current_app.ensure_sync(f)(current_user=user, *args, **kwargs)
         return decorated_function
     return decorator
 
+def use_replica(f):
+    """Run the view's reads on the read replica while it is fresh enough.
+
+    Goes innermost, below role_required, so the principal is still loaded
+    from the primary.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.read_replica = replica_router.available()
+        return current_app.ensure_sync(f)(*args, **kwargs)
+    return decorated_function
+
 def audit_log(action, resource_type=None):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            result = f(*args, **kwargs)
+            result = current_app.ensure_sync(f)(*args, **kwargs)
             
             try:
                 current_user_id = get_jwt_identity()
                 if current_user_id:
-                    log = AuditLog(
+                    audit_writer.enqueue(
                         user_id=current_user_id,
                         action=action,
                         resource_type=resource_type,
                         ip_address=request.remote_addr,
                         details={'endpoint': request.endpoint, 'method': request.method}
                     )
-                    db.session.add(log)
-                    db.session.commit()
             except Exception as e:
                 # Don't fail the request if audit logging fails
                 print(f"Audit logging failed: {e}")
@@ -0,0 +1,97 @@
+from functools import partial
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Engine settings per database backend, driven by the DB_* and SQLITE_*
+# config keys.
+#
+# PostgreSQL gets a sized QueuePool that recycles connections before the
+# server or a load balancer drops them and pings each one on checkout, so
+# a restarted database costs one retry instead of a failed request.
+#
+# SQLite has no server-side pool to tune; what matters is how connections
+# share the file. Every new connection switches to WAL (readers no longer
+# wait behind a writer), relaxes fsync to NORMAL (safe under WAL), waits
+# on a locked database instead of failing at once and gets a larger page
+# cache and memory-mapped I/O.
+
+JOURNAL_MODES = ('delete', 'truncate', 'persist', 'memory', 'wal', 'off')
+SYNCHRONOUS_LEVELS = ('off', 'normal', 'full', 'extra')
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database."""
+    if is_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def sqlite_pragmas(config):
+    """(pragma, value) pairs to run on every new SQLite connection."""
+    journal_mode = config['SQLITE_JOURNAL_MODE'].lower()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE must be one of {', '.join(JOURNAL_MODES)}")
+    synchronous = config['SQLITE_SYNCHRONOUS'].lower()
+    if synchronous not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of {', '.join(SYNCHRONOUS_LEVELS)}")
+    return (
+        ('journal_mode', journal_mode),
+        ('synchronous', synchronous),
+        ('busy_timeout', int(config['SQLITE_BUSY_TIMEOUT'])),
+        ('cache_size', int(config['SQLITE_CACHE_SIZE'])),
+        ('mmap_size', int(config['SQLITE_MMAP_SIZE'])),
+    )
+
+
+def _apply_pragmas(pragmas, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+def _effective_pragmas(engine, pragmas):
+    with engine.connect() as connection:
+        settings = {name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+                    for name, value in pragmas}
+    settings['synchronous'] = SYNCHRONOUS_LEVELS[settings['synchronous']]
+    return settings
+
+
+def init_engines(app, db):
+    """Install per-connection settings on db's engines and log them.
+
+    Runs after db.init_app, which has already built the engines from
+    engine_options().
+    """
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        engines = dict(db.engines)
+
+    for bind_key, engine in engines.items():
+        backend = engine.url.get_backend_name()
+        if backend == 'sqlite':
+            event.listen(engine, 'connect', partial(_apply_pragmas, pragmas))
+            settings = _effective_pragmas(engine, pragmas)
+        else:
+            pool = engine.pool
+            settings = {
+                'pool': type(pool).__name__,
+                'pool_size': pool.size() if hasattr(pool, 'size') else None,
+                'max_overflow': getattr(pool, '_max_overflow', None),
+                'pool_recycle': pool._recycle,
+                'pool_pre_ping': pool._pre_ping,
+            }
+        app.logger.info('Database engine %s (%s): %s', bind_key or 'default', backend,
+                        ', '.join(f'{name}={value}' for name, value in settings.items()))
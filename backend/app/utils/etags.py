@@ -0,0 +1,86 @@
+import hashlib
+from flask import after_this_request, make_response, request
+from sqlalchemy import func, select
+from app import db
+from app.models import User
+from app.utils.loading import NAME_RELATIONSHIPS
+from app.utils.streaming import wants_ndjson
+
+# Conditional GETs for polling clients.
+#
+# Views compute a weak ETag from what a response is built from rather than
+# from the response itself: a collection from max(updated_at) and COUNT(*)
+# over the rows its query would return (an insert or update raises the
+# maximum, a delete or a row leaving the scope changes the count), a
+# detail view from the row's updated_at. Related users' names are part of
+# the payload but not of the row, so they are folded in too. The tag also
+# covers the URL, the response format and the principal, since each of
+# those changes the body for the same rows.
+#
+# conditional() then answers a matching If-None-Match with 304 before the
+# view runs its page query or serializes anything.
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def _etag(principal, *validators):
+    key = repr((request.full_path, wants_ndjson(), principal.id, principal.role) + validators)
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _shows_names(model, only):
+    return any(only is None or field in only for field in NAME_RELATIONSHIPS.get(model, {}))
+
+
+def names_version():
+    """Scalar subquery for the last time any user (and so any name) changed."""
+    return select(func.max(User.updated_at)).scalar_subquery()
+
+
+def collection_etag(query, model, principal, only=None):
+    """ETag for the rows query (a record_query with its filters) selects.
+
+    Runs a single aggregate over the same WHERE clause, without the joins,
+    ordering or paging.
+    """
+    validators = [func.max(model.updated_at), func.count()]
+    if _shows_names(model, only):
+        validators.append(names_version())
+    statement = select(*validators).select_from(model)
+    if query.whereclause is not None:
+        statement = statement.where(query.whereclause)
+    return _etag(principal, *db.session.execute(statement).one())
+
+
+def row_etag(row, principal, only=None, *validators):
+    """ETag for a detail view of row, which must be loaded as the view dumps it.
+
+    Extra validators (such as include_versions) cover nested data.
+    """
+    names = tuple(
+        (getattr(row, relationship.key).first_name, getattr(row, relationship.key).last_name)
+        for field, relationship in NAME_RELATIONSHIPS.get(type(row), {}).items()
+        if only is None or field in only
+    )
+    return _etag(principal, type(row).__tablename__, row.id, row.updated_at, names, *validators)
+
+
+def conditional(etag):
+    """Return a 304 response if the client already has etag, else None.
+
+    When None is returned the view carries on, and its 200 response is sent
+    with the ETag so the client can revalidate next time.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        return response
+
+    @after_this_request
+    def add_etag(response):
+        if response.status_code == 200:
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+        return response
+    return None
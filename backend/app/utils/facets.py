@@ -0,0 +1,77 @@
+from flask import abort, jsonify, make_response, request
+from sqlalchemy import String, cast, func, literal, null, select, union_all
+from app import db
+from app.utils.pagination import encode_cursor, keyset_order, keyset_ordering, page_size
+
+# Facet counts alongside a filtered page.
+#
+# ?facets=status,review_type asks for the number of rows in each bucket of
+# those columns across the whole filtered collection (not just the page).
+# The page and every facet's GROUP BY are combined with UNION ALL into a
+# single statement, so a filtered screen with its bucket counts costs one
+# database round trip:
+#
+#   SELECT page.*, NULL, NULL, NULL FROM (<page query>) AS page
+#   UNION ALL
+#   SELECT NULL, ..., 'status', status, count(*) FROM ... GROUP BY status
+#   UNION ALL ...
+#
+# Page rows come back first, in page order.
+
+
+def requested_facets(allowed):
+    """Parse ?facets=a,b against allowed column names; [] when absent."""
+    value = request.args.get('facets')
+    if not value:
+        return []
+    facets = [facet.strip() for facet in value.split(',') if facet.strip()]
+    unknown = [facet for facet in facets if facet not in allowed]
+    if unknown:
+        abort(make_response(jsonify({
+            'message': f"Cannot facet on {', '.join(unknown)}; use one of: {', '.join(allowed)}"
+        }), 400))
+    return list(dict.fromkeys(facets))
+
+
+def paginate_with_facets(query, model, facets, sort=None):
+    """paginate() plus grouped counts for facets, in one statement.
+
+    query must be unordered and carry every filter; the cursor only
+    narrows the page, never the counts. Returns (rows, next_cursor,
+    counts) where counts is {facet: {value: count}} with values as strings.
+    """
+    limit = page_size()
+    page = (keyset_order(query, model, sort)
+            .add_columns(func.row_number().over(order_by=keyset_ordering(model, sort))
+                         .label('page_position'))
+            .limit(limit + 1)
+            .subquery('page'))
+    width = len(page.c)
+
+    parts = [select(*page.c, null().label('facet_name'), null().label('facet_value'),
+                    null().label('facet_count'))]
+    for facet in facets:
+        column = getattr(model, facet)
+        parts.append(
+            query.with_entities(*([null()] * width), literal(facet), cast(column, String), func.count())
+            .group_by(column)
+            .statement
+        )
+    combined = union_all(*parts).subquery('faceted')
+    result = db.session.execute(
+        select(combined).order_by(combined.c.facet_name.is_not(None), combined.c.page_position)
+    ).all()
+
+    rows, counts = [], {facet: {} for facet in facets}
+    for row in result:
+        if row.facet_name is None:
+            rows.append(row)
+        else:
+            # Rows with no value are counted under ''
+            counts[row.facet_name][row.facet_value or ''] = row.facet_count
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1], sort[0] if sort else None)
+    return rows, next_cursor, counts
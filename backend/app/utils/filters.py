@@ -0,0 +1,93 @@
+from datetime import date, datetime
+from flask import abort, jsonify, make_response, request
+from sqlalchemy import Enum, select
+from app.utils.loading import LOOKUP_FIELDS
+
+# Declarative query-string filters for collection endpoints.
+#
+# An endpoint declares which parameters it accepts as
+# {param: (column name, operator)}; filter_query turns the ones present in
+# the request into WHERE clauses on indexed columns, so clients receive
+# only the rows they display. Operators:
+#
+#   'in'   comma-separated values, any of which may match
+#   'eq'   a single value
+#   'gte'  inclusive lower bound
+#   'lte'  inclusive upper bound
+#
+# Lookup fields (see LOOKUP_FIELDS) are filtered by name with 'in'; names
+# match case- and whitespace-insensitively, like they are stored.
+
+TRUE_VALUES = ('true', '1', 'yes')
+FALSE_VALUES = ('false', '0', 'no')
+
+
+def _invalid(param, value):
+    abort(make_response(jsonify({'message': f'Invalid value for {param}: {value}'}), 400))
+
+
+def parse_value(column, param, value):
+    """Convert a query-string value to the column's Python type, or 400."""
+    column_type = column.type
+    if isinstance(column_type, Enum):
+        if value not in column_type.enums:
+            _invalid(param, value)
+        return value
+
+    python_type = column_type.python_type
+    try:
+        if python_type is bool:
+            if value.lower() in TRUE_VALUES:
+                return True
+            if value.lower() in FALSE_VALUES:
+                return False
+            raise ValueError(value)
+        if issubclass(python_type, datetime):
+            return datetime.fromisoformat(value)
+        if issubclass(python_type, date):
+            return date.fromisoformat(value)
+        if python_type is int:
+            return int(value)
+    except ValueError:
+        _invalid(param, value)
+    return value
+
+
+def filter_clauses(model, filters):
+    """WHERE clauses for the filters in filters present on this request."""
+    clauses = []
+    for param, (name, operator) in filters.items():
+        raw = request.args.get(param)
+        if raw is None or raw == '':
+            continue
+        if name in LOOKUP_FIELDS.get(model, {}):
+            clauses.append(_lookup_clause(LOOKUP_FIELDS[model][name], raw))
+            continue
+        attribute = getattr(model, name)
+        column = model.__table__.columns[name]
+
+        if operator == 'in':
+            values = [parse_value(column, param, v.strip()) for v in raw.split(',') if v.strip()]
+            clauses.append(attribute.in_(values))
+        else:
+            value = parse_value(column, param, raw)
+            if operator == 'eq':
+                clauses.append(attribute == value)
+            elif operator == 'gte':
+                clauses.append(attribute >= value)
+            elif operator == 'lte':
+                clauses.append(attribute <= value)
+    return clauses
+
+
+def _lookup_clause(relationship, raw):
+    lookup = relationship.property.mapper.class_
+    local, remote = relationship.property.local_remote_pairs[0]
+    keys = [lookup.normalize(v) for v in raw.split(',') if v.strip()]
+    return local.in_(select(lookup.id).where(lookup.key.in_(keys)))
+
+
+def filter_query(query, model, filters):
+    """Apply the request's declared filters to query."""
+    clauses = filter_clauses(model, filters)
+    return query.filter(*clauses) if clauses else query
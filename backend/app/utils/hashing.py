@@ -0,0 +1,119 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from app.utils.passwords import current_policy, encode_password, verify_password
+
+
+class HashingUnavailable(Exception):
+    """Raised when the hashing pool is saturated or too slow to answer."""
+
+
+class HashingService:
+    """Runs password hashing in a process pool.
+
+    Hashing is deliberately CPU-bound and holds the GIL, so running it in a
+    request thread stalls every other request handled by the same worker.
+    Requests here hand the work to PASSWORD_HASH_WORKERS child processes.
+    At most PASSWORD_HASH_MAX_PENDING jobs may be queued or running; beyond
+    that, and when a job does not finish within PASSWORD_HASH_TIMEOUT
+    seconds, HashingUnavailable is raised so the view can answer 503
+    instead of piling up threads.
+
+    If a child dies (killed by the OOM killer, say) the pool is broken for
+    good; the call that finds it so gets HashingUnavailable and the pool is
+    discarded, so the next call starts a fresh one.
+
+    Setting PASSWORD_HASH_WORKERS to 0 hashes inline in the calling thread.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 64)
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 5.0)
+
+        self.shutdown()
+        self._app = app
+        app.extensions['hashing'] = self
+
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def hash_password(self, password):
+        scheme, params = current_policy()
+        return self._run(encode_password, password, scheme, params)
+
+    def check_password(self, pwhash, password):
+        return self._run(verify_password, pwhash, password)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run(self, fn, *args):
+        config = self._app.config
+        if config['PASSWORD_HASH_WORKERS'] <= 0:
+            return fn(*args)
+
+        executor, slots = self._get_executor()
+        if not slots.acquire(blocking=False):
+            raise HashingUnavailable('Password hashing queue is full')
+
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            slots.release()
+            self._discard(executor)
+            raise HashingUnavailable('Password hashing pool crashed')
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=config['PASSWORD_HASH_TIMEOUT'])
+        except TimeoutError:
+            future.cancel()
+            raise HashingUnavailable('Password hashing timed out')
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise HashingUnavailable('Password hashing pool crashed')
+
+    def _discard(self, executor):
+        # Only if no other thread has replaced it already
+        with self._lock:
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self):
+        # Returned as a pair so that jobs on a discarded pool release the
+        # slots they took, not those of its replacement
+        executor, slots = self._executor, self._slots
+        if executor is not None:
+            return executor, slots
+        with self._lock:
+            if self._executor is None:
+                config = self._app.config
+                self._slots = threading.BoundedSemaphore(config['PASSWORD_HASH_MAX_PENDING'])
+                # spawn rather than fork: request workers already run
+                # background threads whose locks must not leak into children
+                self._executor = ProcessPoolExecutor(
+                    max_workers=config['PASSWORD_HASH_WORKERS'],
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor, self._slots
+
+
+hashing = HashingService()
@@ -0,0 +1,72 @@
+from collections import namedtuple
+from flask import abort, jsonify, make_response, request
+from sqlalchemy import func, select
+from app import db
+from app.utils.etags import names_version
+from app.utils.loading import NAME_RELATIONSHIPS
+from app.utils.records import record_query
+
+# Nested resources for ?include= on detail endpoints.
+#
+# Each Include names the model to load, the schema it dumps like, the read
+# scope that guards its standalone endpoint and the foreign key that ties it
+# to the parent. load_includes fetches one relationship for any number of
+# parents with a single "fk IN (...) AND <scope>" query, so a profile with
+# four includes costs four queries no matter how many rows they hold, and a
+# caller never sees a nested row its own list endpoint would hide.
+
+Include = namedtuple('Include', 'model schema scope foreign_key where')
+
+
+def requested_includes(allowed):
+    """Parse ?include=a,b against allowed names; [] when absent."""
+    value = request.args.get('include')
+    if not value:
+        return []
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        abort(make_response(jsonify({
+            'message': f"Cannot include {', '.join(unknown)}; use one of: {', '.join(allowed)}"
+        }), 400))
+    return list(dict.fromkeys(names))
+
+
+def load_includes(principal, relations, names, parent_ids):
+    """Load each named relation for parent_ids.
+
+    Returns {name: {parent_id: [record, ...]}} with records in
+    (created_at, id) order.
+    """
+    loaded = {}
+    for name in names:
+        relation = relations[name]
+        model, foreign_key = relation.model, relation.foreign_key
+        query, serialize = record_query(model, relation.schema, extra=(foreign_key.key,))
+        rows = (query.filter(foreign_key.in_(parent_ids), relation.scope(principal), *relation.where)
+                .order_by(model.created_at, model.id))
+
+        by_parent = loaded[name] = {}
+        for row in rows:
+            by_parent.setdefault(getattr(row, foreign_key.key), []).append(serialize(row))
+    return loaded
+
+
+def include_versions(principal, relations, names, parent_ids):
+    """(max(updated_at), count) of each named relation for parent_ids.
+
+    Validates a detail view's includes for its ETag without loading them;
+    all relations are aggregated in one query. Returns () when names is empty.
+    """
+    columns = []
+    for name in names:
+        relation = relations[name]
+        model = relation.model
+        where = (relation.foreign_key.in_(parent_ids), relation.scope(principal), *relation.where)
+        columns.append(select(func.max(model.updated_at)).where(*where).scalar_subquery())
+        columns.append(select(func.count()).select_from(model).where(*where).scalar_subquery())
+    if any(relations[name].model in NAME_RELATIONSHIPS for name in names):
+        columns.append(names_version())
+    if not columns:
+        return ()
+    return tuple(db.session.execute(select(*columns)).one())
@@ -0,0 +1,105 @@
+from functools import lru_cache
+from flask import abort, current_app, jsonify, make_response, request
+from sqlalchemy.orm import joinedload, load_only, raiseload
+from app.models import User, Goal, Review, Skill
+
+# Schema fields that are computed from a related User's name. Queries that
+# serialize them load the relationship up front (one JOIN, name columns
+# only) instead of one lazy SELECT per row.
+NAME_RELATIONSHIPS = {
+    Goal: {'employee_name': Goal.employee},
+    Review: {'reviewee_name': Review.reviewee, 'reviewer_name': Review.reviewer},
+}
+
+# Schema fields stored as an integer key into a lookup table; the name is
+# read through the relationship and written by resolving it to an ID
+LOOKUP_FIELDS = {
+    User: {'department': User.department_ref},
+    Goal: {'category': Goal.category_ref},
+    Skill: {'skill_name': Skill.skill_name_ref, 'category': Skill.category_ref},
+}
+
+# Schema fields computed from other columns of the same row
+DERIVED_COLUMNS = {
+    User: {'full_name': ('first_name', 'last_name')},
+}
+
+# Needed by the keyset cursor whatever the client asked for
+ALWAYS_LOADED = ('id', 'created_at')
+
+# Columns a view reads itself before serializing (detail views build their
+# ETag from updated_at)
+VIEW_COLUMNS = {
+    User: ('is_active', 'updated_at'),
+    Goal: ('updated_at',),
+    Review: ('updated_at',),
+    Skill: ('updated_at',),
+}
+
+
+def eager(options):
+    """Loader options for a serialization query.
+
+    With RAISE_ON_LAZY_LOAD enabled (meant for development and tests) any
+    relationship not covered by options raises instead of lazily loading,
+    so a schema change that would reintroduce N+1 queries fails loudly.
+    """
+    if current_app.config['RAISE_ON_LAZY_LOAD']:
+        return options + (raiseload('*'),)
+    return options
+
+
+@lru_cache(maxsize=None)
+def _dump_fields(schema_cls):
+    return frozenset(schema_cls().dump_fields)
+
+
+def requested_fields(schema_cls):
+    """Parse ?fields=a,b,c into the set to pass as the schema's only=.
+
+    Returns None when the parameter is absent (dump everything).
+    """
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    only = {field.strip() for field in fields.split(',') if field.strip()}
+    unknown = only - _dump_fields(schema_cls)
+    if unknown:
+        abort(make_response(jsonify({
+            'message': f"Unknown fields: {', '.join(sorted(unknown))}"
+        }), 400))
+    return only
+
+
+def load_options(model, only=None):
+    """Loader options that read exactly what dumping `only` needs.
+
+    Columns outside the fieldset are deferred, so large Text columns such
+    as descriptions and review comments are never fetched for a list that
+    does not show them.
+    """
+    relationships = NAME_RELATIONSHIPS.get(model, {})
+    lookups = LOOKUP_FIELDS.get(model, {})
+    names = (User.first_name, User.last_name)
+
+    if only is None:
+        return eager(tuple(
+            joinedload(relationship).load_only(*names)
+            for relationship in relationships.values()
+        ) + tuple(joinedload(relationship) for relationship in lookups.values()))
+
+    columns = set(ALWAYS_LOADED) | set(VIEW_COLUMNS.get(model, ()))
+    for field in only:
+        if field in model.__table__.columns:
+            columns.add(field)
+        columns.update(DERIVED_COLUMNS.get(model, {}).get(field, ()))
+
+    options = [load_only(*(getattr(model, column) for column in columns),
+                         raiseload=current_app.config['RAISE_ON_LAZY_LOAD'])]
+    for field, relationship in relationships.items():
+        if field in only:
+            options.append(joinedload(relationship).load_only(*names))
+    for field, relationship in lookups.items():
+        if field in only:
+            options.append(joinedload(relationship))
+    return eager(tuple(options))
@@ -0,0 +1,124 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import abort, current_app, jsonify, make_response, request, url_for
+from sqlalchemy import and_, or_
+
+# Keyset pagination over (sort key, id).
+#
+# Collection endpoints return one page as a plain JSON array, so existing
+# clients keep working. When more rows exist, the opaque cursor for the
+# next page is sent in the X-Next-Cursor header and as a Link rel="next"
+# URL. Each page is a range scan from the last (sort key, id) seen, so
+# the cost of page N does not grow with N the way OFFSET does. The sort
+# key defaults to created_at; endpoints may allow others through ?sort=.
+
+
+def _bad_request(message):
+    abort(make_response(jsonify({'message': message}), 400))
+
+
+def _column(attribute):
+    return attribute.property.columns[0]
+
+
+def _may_be_null(attribute):
+    # Columns with an insert default are always populated in practice
+    column = _column(attribute)
+    return column.nullable and column.default is None
+
+
+def encode_cursor(row, sort_column=None):
+    key = sort_column.key if sort_column is not None else 'created_at'
+    value = getattr(row, key)
+    if isinstance(value, date):
+        value = value.isoformat()
+    payload = json.dumps([value, row.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_column=None):
+    python_type = _column(sort_column).type.python_type if sort_column is not None else datetime
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if value is not None and issubclass(python_type, datetime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and issubclass(python_type, date):
+            value = date.fromisoformat(value)
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        _bad_request('Invalid cursor')
+
+
+def page_size():
+    config = current_app.config
+    try:
+        limit = int(request.args.get('limit', config['PAGE_SIZE_DEFAULT']))
+    except ValueError:
+        _bad_request('limit must be an integer')
+    return max(1, min(limit, config['PAGE_SIZE_MAX']))
+
+
+def sort_order(model, allowed):
+    """Parse ?sort=key or ?sort=-key (descending) against allowed column names.
+
+    Returns (column, descending); (created_at, False) when absent.
+    """
+    value = request.args.get('sort', 'created_at')
+    descending = value.startswith('-')
+    key = value[1:] if descending else value
+    if key not in allowed:
+        _bad_request(f"Cannot sort by {key}; use one of: {', '.join(allowed)}")
+    return getattr(model, key), descending
+
+
+def keyset_ordering(model, sort=None):
+    """ORDER BY clauses for sort (from sort_order), with id as tie-breaker."""
+    column, descending = sort or (model.created_at, False)
+    ordering = column.desc() if descending else column.asc()
+    if _may_be_null(column):
+        ordering = ordering.nulls_last()
+    return ordering, model.id.desc() if descending else model.id
+
+
+def keyset_order(query, model, sort=None):
+    """Order query by sort (from sort_order) then id, starting after ?cursor=."""
+    column, descending = sort or (model.created_at, False)
+    after = (lambda a, b: a < b) if descending else (lambda a, b: a > b)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        value, row_id = decode_cursor(cursor, column)
+        if value is None:
+            # NULLs sort last, so only NULL rows remain
+            query = query.filter(column.is_(None), after(model.id, row_id))
+        else:
+            condition = or_(after(column, value), and_(column == value, after(model.id, row_id)))
+            if _may_be_null(column):
+                condition = or_(condition, column.is_(None))
+            query = query.filter(condition)
+
+    return query.order_by(*keyset_ordering(model, sort))
+
+
+def paginate(query, model, sort=None):
+    """Apply the request's cursor and limit to query.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    limit = page_size()
+    rows = keyset_order(query, model, sort).limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1], sort[0] if sort else None)
+    return rows, None
+
+
+def page_response(data, next_cursor):
+    response = jsonify(data)
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{url_for(request.endpoint, _external=True, **args)}>; rel="next"'
+    return response, 200
@@ -0,0 +1,117 @@
+import bcrypt
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_SCHEME = 'scrypt'
+
+
+class PBKDF2Hasher:
+    name = 'pbkdf2'
+    defaults = {'digest': 'sha256', 'iterations': 600000}
+
+    def encode(self, password, params):
+        method = f"pbkdf2:{params['digest']}:{params['iterations']}"
+        return generate_password_hash(password, method=method)
+
+    def verify(self, encoded, password):
+        return check_password_hash(encoded, password)
+
+    def identify(self, encoded):
+        return encoded.startswith('pbkdf2:')
+
+    def params_of(self, encoded):
+        _, digest, iterations = encoded.split('$', 1)[0].split(':')
+        return {'digest': digest, 'iterations': int(iterations)}
+
+
+class ScryptHasher:
+    name = 'scrypt'
+    defaults = {'n': 2 ** 15, 'r': 8, 'p': 1}
+
+    def encode(self, password, params):
+        method = f"scrypt:{params['n']}:{params['r']}:{params['p']}"
+        return generate_password_hash(password, method=method)
+
+    def verify(self, encoded, password):
+        return check_password_hash(encoded, password)
+
+    def identify(self, encoded):
+        return encoded.startswith('scrypt:')
+
+    def params_of(self, encoded):
+        _, n, r, p = encoded.split('$', 1)[0].split(':')
+        return {'n': int(n), 'r': int(r), 'p': int(p)}
+
+
+class BcryptHasher:
+    name = 'bcrypt'
+    defaults = {'rounds': 12}
+
+    def encode(self, password, params):
+        salt = bcrypt.gensalt(rounds=params['rounds'])
+        return bcrypt.hashpw(password.encode(), salt).decode()
+
+    def verify(self, encoded, password):
+        return bcrypt.checkpw(password.encode(), encoded.encode())
+
+    def identify(self, encoded):
+        return encoded.startswith(('$2a$', '$2b$', '$2y$'))
+
+    def params_of(self, encoded):
+        return {'rounds': int(encoded.split('$')[2])}
+
+
+HASHERS = {hasher.name: hasher for hasher in (PBKDF2Hasher(), ScryptHasher(), BcryptHasher())}
+
+
+def register_hasher(hasher):
+    HASHERS[hasher.name] = hasher
+
+
+def identify_hasher(encoded):
+    for hasher in HASHERS.values():
+        if hasher.identify(encoded):
+            return hasher
+    return None
+
+
+def current_policy():
+    """Return the (scheme, params) new hashes should be created with.
+
+    The scheme comes from PASSWORD_HASH_SCHEME and its parameters from
+    PASSWORD_HASH_PARAMS[scheme], falling back to the hasher defaults.
+    """
+    scheme, overrides = DEFAULT_SCHEME, {}
+    if has_app_context():
+        scheme = current_app.config.get('PASSWORD_HASH_SCHEME', DEFAULT_SCHEME)
+        overrides = current_app.config.get('PASSWORD_HASH_PARAMS', {}).get(scheme, {})
+    if scheme not in HASHERS:
+        raise ValueError(f"Unknown password hash scheme '{scheme}'")
+    return scheme, {**HASHERS[scheme].defaults, **overrides}
+
+
+# encode_password and verify_password take only plain arguments so they
+# can be shipped to the hashing process pool.
+
+def encode_password(password, scheme, params):
+    return HASHERS[scheme].encode(password, params)
+
+
+def verify_password(encoded, password):
+    hasher = identify_hasher(encoded or '')
+    if hasher is None:
+        return False
+    return hasher.verify(encoded, password)
+
+
+def needs_rehash(encoded, scheme=None, params=None):
+    """True when encoded was not produced with the given (or current) policy."""
+    if scheme is None:
+        scheme, params = current_policy()
+    hasher = identify_hasher(encoded or '')
+    if hasher is None or hasher.name != scheme:
+        return True
+    try:
+        return hasher.params_of(encoded) != params
+    except (ValueError, IndexError):
+        return True
@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from app.utils.queries import principal_row
+
+# The subset of a User that access checks need. Views only read
+# current_user.id and current_user.role, so a tuple is enough.
+Principal = namedtuple('Principal', ['id', 'role', 'is_active', 'manager_id'])
+
+
+class PrincipalCache:
+    """Bounded LRU cache of principals with a per-entry TTL.
+
+    Each worker process holds its own cache. Writes that change a user's
+    role, status or manager must call invalidate(), which bumps a generation
+    counter kept in a small SQLite file (PRINCIPAL_CACHE_DB) shared by all
+    workers on the host, the same way the login throttle shares its
+    buckets. Every lookup reads the counter, and a worker that sees it move
+    drops its whole cache, so a deactivated user loses access on the next
+    request whichever worker serves it.
+
+    Workers on other hosts do not see the file; for them an entry stays
+    valid until it expires, so PRINCIPAL_CACHE_TTL bounds how long a
+    change takes to reach every host.
+    """
+
+    def __init__(self, maxsize=1024, ttl=5):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._app = None
+        self._entries = OrderedDict()
+        self._generation = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def init_app(self, app):
+        self.maxsize = app.config.setdefault('PRINCIPAL_CACHE_SIZE', 1024)
+        self.ttl = app.config.setdefault('PRINCIPAL_CACHE_TTL', 5)
+        app.config.setdefault('PRINCIPAL_CACHE_DB',
+                              os.path.join(tempfile.gettempdir(), 'performance-hub-principals.sqlite3'))
+        self._app = app
+        self.clear()
+
+    def generation(self):
+        """The host-wide invalidation counter."""
+        if self._app is None:
+            return None
+        row = self._connection().execute('SELECT value FROM principal_generation WHERE id = 0').fetchone()
+        return row[0] if row else 0
+
+    def get(self, user_id, generation=None):
+        if generation is None:
+            generation = self.generation()
+        with self._lock:
+            if generation != self._generation:
+                # Another worker changed some user; we cannot tell which
+                self._entries.clear()
+                self._generation = generation
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def set(self, principal, generation=None):
+        """Cache principal, unless it was loaded before the last invalidation.
+
+        generation is the counter read before principal was loaded.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Forget user_id here and make every other worker on the host drop its cache.
+
+        Call after the change has been committed.
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if self._app is not None:
+            self._connection().execute(
+                'INSERT INTO principal_generation (id, value) VALUES (0, 1) '
+                'ON CONFLICT(id) DO UPDATE SET value = value + 1'
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _connection(self):
+        path = self._app.config['PRINCIPAL_CACHE_DB']
+        conns = getattr(self._local, 'connections', None)
+        if conns is None:
+            conns = self._local.connections = {}
+        conn = conns.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS principal_generation ('
+                'id INTEGER PRIMARY KEY, value INTEGER NOT NULL)'
+            )
+            conns[path] = conn
+        return conn
+
+
+principal_cache = PrincipalCache()
+
+
+def load_principal(user_id):
+    """Return the cached principal for user_id, loading it on a miss."""
+    # Read before loading, so a change committed while we load is not cached
+    generation = principal_cache.generation()
+    principal = principal_cache.get(user_id, generation)
+    if principal is not None:
+        return principal
+
+    row = principal_row(user_id)
+    if row is None:
+        return None
+
+    principal = Principal(row.id, row.role, bool(row.is_active), row.manager_id)
+    principal_cache.set(principal, generation)
+    return principal
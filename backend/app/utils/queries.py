@@ -0,0 +1,88 @@
+from collections import namedtuple
+from functools import lru_cache
+from flask import current_app
+from sqlalchemy import Integer, bindparam, case, exists, select
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import User, RevokedToken
+
+# Statements for the lookups that run on (nearly) every request.
+#
+# Building a select() and walking it to derive its cache key costs more
+# Python time than a primary-key lookup takes on the database. Each
+# statement here is built once per process with bindparam() placeholders
+# and reused; SQLAlchemy memoizes the cache key on the statement object,
+# so a request only binds values and the compiled SQL comes straight from
+# the engine's compiled cache.
+
+# Stands in for a principal while building a scope; scopes only read these
+_ScopeOwner = namedtuple('_ScopeOwner', ['id', 'role'])
+
+
+@lru_cache(maxsize=None)
+def _principal_statement():
+    return (select(User.id, User.role, User.is_active, User.manager_id)
+            .where(User.id == bindparam('user_id')))
+
+
+@lru_cache(maxsize=None)
+def _login_statement():
+    # Login serializes the user, department included
+    return (select(User).options(joinedload(User.department_ref))
+            .where(User.email == bindparam('email'), User.is_active == True))
+
+
+@lru_cache(maxsize=None)
+def _email_taken_statement():
+    return select(exists().where(User.email == bindparam('email')))
+
+
+@lru_cache(maxsize=None)
+def _token_revoked_statement():
+    return select(exists().where(RevokedToken.jti == bindparam('jti')))
+
+
+# Bounded: ?fields= lets clients pick `only`, so the keys are open-ended
+@lru_cache(maxsize=256)
+def _scoped_statement(model, scope, role, only, raise_on_lazy_load):
+    # raise_on_lazy_load is only part of the key: load_options reads it.
+    # Imported here because loading.py needs the mapped backrefs, and this
+    # module is imported by principal_cache before the mappers configure.
+    from app.utils.loading import load_options
+    owner = _ScopeOwner(bindparam('principal_id', type_=Integer), role)
+    return (select(model, case((scope(owner), True), else_=False).label('allowed'))
+            .options(*load_options(model, only))
+            .where(model.id == bindparam('row_id')))
+
+
+def principal_row(user_id):
+    """(id, role, is_active, manager_id) for user_id, or None."""
+    return db.session.execute(_principal_statement(), {'user_id': user_id}).first()
+
+
+def active_user_by_email(email):
+    return db.session.execute(_login_statement(), {'email': email}).scalar()
+
+
+def email_taken(email):
+    return db.session.execute(_email_taken_statement(), {'email': email}).scalar()
+
+
+def token_revoked(jti):
+    return db.session.execute(_token_revoked_statement(), {'jti': jti}).scalar()
+
+
+def get_scoped(model, row_id, scope, principal, only=None):
+    """Fetch a row and whether scope(principal) allows it, in one query.
+
+    The statement is cached per model, scope, role and fieldset; the
+    principal's ID is bound at execution time. Returns (None, False) when
+    the row does not exist, so callers can still tell 404 from 403.
+    """
+    statement = _scoped_statement(model, scope, principal.role,
+                                  frozenset(only) if only is not None else None,
+                                  current_app.config['RAISE_ON_LAZY_LOAD'])
+    row = db.session.execute(statement, {'row_id': row_id, 'principal_id': principal.id}).first()
+    if row is None:
+        return None, False
+    return row[0], bool(row[1])
@@ -0,0 +1,110 @@
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+class LoginThrottle:
+    """Token buckets for login attempts, shared by all workers on a host.
+
+    Buckets live in a small SQLite file (LOGIN_RATE_LIMIT_DB) rather than
+    in process memory, so every gunicorn worker draws from the same
+    allowance. Each check is one short IMMEDIATE transaction against that
+    file and never touches the application database or the password
+    hasher, which keeps rejections cheap.
+
+    A bucket holds up to `burst` tokens and refills at `rate` tokens per
+    second; each attempt takes one token.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._local = threading.local()
+
+    def init_app(self, app):
+        app.config.setdefault('LOGIN_RATE_LIMIT_ENABLED', True)
+        app.config.setdefault('LOGIN_RATE_LIMIT_DB',
+                              os.path.join(tempfile.gettempdir(), 'performance-hub-login-throttle.sqlite3'))
+        app.config.setdefault('LOGIN_IP_BURST', 20)
+        app.config.setdefault('LOGIN_IP_RATE', 1.0)
+        app.config.setdefault('LOGIN_EMAIL_BURST', 5)
+        app.config.setdefault('LOGIN_EMAIL_RATE', 0.1)
+
+        self._app = app
+        app.extensions['login_throttle'] = self
+
+    def check(self, ip_address, email):
+        """Take a token for this IP and email.
+
+        Returns None when the attempt may proceed, otherwise the number of
+        seconds until it would be allowed.
+        """
+        config = self._app.config
+        if not config['LOGIN_RATE_LIMIT_ENABLED']:
+            return None
+
+        retry_after = self.consume(f'ip:{ip_address}',
+                                   config['LOGIN_IP_BURST'], config['LOGIN_IP_RATE'])
+        if retry_after is None:
+            retry_after = self.consume(f'email:{email.lower()}',
+                                       config['LOGIN_EMAIL_BURST'], config['LOGIN_EMAIL_RATE'])
+        return retry_after
+
+    def consume(self, key, burst, rate):
+        conn = self._connection()
+        now = time.time()
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM login_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                tokens = float(burst)
+            else:
+                tokens = min(float(burst), row[0] + (now - row[1]) * rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = None
+            else:
+                retry_after = math.ceil((1 - tokens) / rate) if rate > 0 else 60
+
+            conn.execute(
+                'INSERT INTO login_buckets (key, tokens, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, '
+                'updated_at = excluded.updated_at',
+                (key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self._local.calls = getattr(self._local, 'calls', 0) + 1
+        if self._local.calls % 1000 == 0:
+            # Idle buckets are full again; dropping them changes nothing
+            conn.execute('DELETE FROM login_buckets WHERE updated_at < ?', (now - 3600,))
+        return retry_after
+
+    def _connection(self):
+        path = self._app.config['LOGIN_RATE_LIMIT_DB']
+        conns = getattr(self._local, 'connections', None)
+        if conns is None:
+            conns = self._local.connections = {}
+        conn = conns.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS login_buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            conns[path] = conn
+        return conn
+
+
+login_throttle = LoginThrottle()
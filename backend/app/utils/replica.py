@@ -0,0 +1,152 @@
+import threading
+import time
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA = 'replica'
+
+
+class RoutingSession(Session):
+    """Session that sends a replica-routed request's reads to the replica bind.
+
+    Views opt in with @use_replica, which sets g.read_replica once the
+    router has checked that the replica is fresh enough. Everything else,
+    including any INSERT/UPDATE/DELETE and ORM flush made while such a
+    request is running (the audit log, for one), stays on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and has_request_context() and g.get('read_replica')
+                and not self._flushing and not isinstance(clause, UpdateBase)):
+            engine = self._db.engines.get(REPLICA)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Decides whether read-only requests may use the replica bind.
+
+    The replica is configured as SQLALCHEMY_BINDS['replica']. Its lag is
+    measured on the replica itself at most once every
+    REPLICA_LAG_CHECK_INTERVAL seconds per worker; while it is more than
+    REPLICA_MAX_LAG seconds behind, or cannot be reached, requests fall
+    back to the primary.
+
+    PostgreSQL standbys report the age of the last replayed transaction
+    (zero when they have replayed everything received). A SQLite replica
+    is a copy of the primary file made with the backup API by sync(); its
+    lag is the time since the last copy finished. Setting
+    REPLICA_SYNC_INTERVAL runs sync() on a background thread, which is
+    meant for local development.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._db = None
+        self._lock = threading.Lock()
+        self._lag = None
+        self._checked_at = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def init_app(self, app, db):
+        app.config.setdefault('REPLICA_MAX_LAG', 5.0)
+        app.config.setdefault('REPLICA_LAG_CHECK_INTERVAL', 1.0)
+        app.config.setdefault('REPLICA_SYNC_INTERVAL', 0)
+
+        self.shutdown()
+        self._app = app
+        self._db = db
+        self._lag = self._checked_at = None
+        app.extensions['replica_router'] = self
+
+        if self.enabled and app.config['REPLICA_SYNC_INTERVAL']:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='replica-sync', daemon=True)
+            self._thread.start()
+
+    @property
+    def enabled(self):
+        return REPLICA in (self._app.config.get('SQLALCHEMY_BINDS') or {})
+
+    def available(self):
+        """True when the replica is configured and no further behind than REPLICA_MAX_LAG."""
+        if not self.enabled:
+            return False
+        lag = self.lag()
+        return lag is not None and lag <= self._app.config['REPLICA_MAX_LAG']
+
+    def lag(self):
+        """Seconds the replica is behind the primary, or None if unknown."""
+        now = time.monotonic()
+        with self._lock:
+            if (self._checked_at is not None
+                    and now - self._checked_at < self._app.config['REPLICA_LAG_CHECK_INTERVAL']):
+                return self._lag
+        lag = self._measure_lag()
+        with self._lock:
+            self._lag, self._checked_at = lag, now
+        return lag
+
+    def _measure_lag(self):
+        engine = self._db.engines[REPLICA]
+        try:
+            with engine.connect() as connection:
+                if engine.dialect.name == 'postgresql':
+                    return connection.execute(text(
+                        'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() '
+                        'THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) '
+                        'END'
+                    )).scalar() or 0.0
+                if engine.dialect.name == 'sqlite':
+                    synced_at = connection.execute(text('SELECT synced_at FROM replica_sync')).scalar()
+                    return time.time() - synced_at if synced_at is not None else None
+                return 0.0
+        except Exception as e:
+            self._app.logger.warning('Replica lag check failed: %s', e)
+            return None
+
+    def sync(self):
+        """Copy the primary SQLite database onto the SQLite replica."""
+        primary, replica = self._db.engines[None], self._db.engines[REPLICA]
+        if primary.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+            raise RuntimeError('sync() copies a SQLite primary to a SQLite replica')
+
+        source, target = primary.raw_connection(), replica.raw_connection()
+        try:
+            started_at = time.time()
+            source.driver_connection.backup(target.driver_connection)
+            # Lives only in the copy; the next backup replaces it
+            copy = target.driver_connection
+            copy.execute('CREATE TABLE replica_sync (synced_at REAL NOT NULL)')
+            copy.execute('INSERT INTO replica_sync (synced_at) VALUES (?)', (started_at,))
+            copy.commit()
+        finally:
+            source.close()
+            target.close()
+        with self._lock:
+            self._checked_at = None
+
+    def shutdown(self, timeout=5.0):
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._stop.set()
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        interval = self._app.config['REPLICA_SYNC_INTERVAL']
+        while True:
+            try:
+                with self._app.app_context():
+                    self.sync()
+            except Exception as e:
+                self._app.logger.warning('Replica sync failed: %s', e)
+            if self._stop.wait(interval):
+                return
+
+
+replica_router = ReplicaRouter()
@@ -0,0 +1,136 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import RevokedToken
+from app.utils.queries import token_revoked
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over string keys.
+
+    Sized for `capacity` keys at the given false positive rate. Bit
+    positions come from double hashing a single blake2b digest.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationList:
+    """JTI blocklist with an in-memory bloom filter in front of the DB.
+
+    Every protected request asks whether its token was revoked. The bloom
+    filter answers "no" for almost all of them without touching storage;
+    only possible positives are confirmed against revoked_tokens. The
+    filter is rebuilt from unexpired revocations every
+    JWT_REVOCATION_REBUILD_INTERVAL seconds, which is also how revocations
+    made by other workers become visible here.
+
+    A rebuild's query can start before a revoke() on this worker commits,
+    so JTIs revoked here are also kept in a pending set that is merged
+    into every new filter. An entry is dropped once a rebuild that started
+    after it was added has read it from the table.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._filter = None
+        self._built_at = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.filter_hits = 0
+        self.db_checks = 0
+
+    def init_app(self, app, jwt):
+        app.config.setdefault('JWT_REVOCATION_CAPACITY', 100000)
+        app.config.setdefault('JWT_REVOCATION_ERROR_RATE', 0.001)
+        app.config.setdefault('JWT_REVOCATION_REBUILD_INTERVAL', 60)
+
+        self._app = app
+        self._filter = None
+        self._built_at = 0
+        self._pending = set()
+        self.filter_hits = self.db_checks = 0
+        app.extensions['revocation_list'] = self
+
+        @jwt.token_in_blocklist_loader
+        def check_if_token_revoked(jwt_header, jwt_payload):
+            return self.is_revoked(jwt_payload['jti'])
+
+    def rebuild(self):
+        with self._lock:
+            committed = set(self._pending)
+        jtis = self._unexpired_jtis()
+        capacity = max(self._app.config['JWT_REVOCATION_CAPACITY'], 2 * len(jtis))
+        bloom = BloomFilter(capacity, self._app.config['JWT_REVOCATION_ERROR_RATE'])
+        for jti in jtis:
+            bloom.add(jti)
+
+        with self._lock:
+            for jti in self._pending:
+                bloom.add(jti)
+            # Committed before the query ran, so it has them now
+            self._pending -= committed
+            self._filter = bloom
+            self._built_at = time.monotonic()
+
+    def _unexpired_jtis(self):
+        now = datetime.utcnow()
+        return [jti for (jti,) in db.session.query(RevokedToken.jti).filter(
+            (RevokedToken.expires_at.is_(None)) | (RevokedToken.expires_at > now)
+        )]
+
+    def revoke(self, jwt_payload):
+        expires = jwt_payload.get('exp')
+        db.session.add(RevokedToken(
+            jti=jwt_payload['jti'],
+            token_type=jwt_payload.get('type', 'access'),
+            user_id=jwt_payload.get('sub'),
+            expires_at=datetime.utcfromtimestamp(expires) if expires else None
+        ))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent logout with the same token got there first
+            db.session.rollback()
+
+        self._ensure_fresh()
+        with self._lock:
+            self._pending.add(jwt_payload['jti'])
+            self._filter.add(jwt_payload['jti'])
+
+    def is_revoked(self, jti):
+        self._ensure_fresh()
+        if jti not in self._filter:
+            self.filter_hits += 1
+            return False
+        self.db_checks += 1
+        return token_revoked(jti)
+
+    def _ensure_fresh(self):
+        interval = self._app.config['JWT_REVOCATION_REBUILD_INTERVAL']
+        if self._filter is None or time.monotonic() - self._built_at > interval:
+            self.rebuild()
+
+
+revocation_list = RevocationList()
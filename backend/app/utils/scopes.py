@@ -0,0 +1,135 @@
+from sqlalchemy import exists, false, or_, select, true, update
+from app import db
+from app.models import User, Goal, Review, Skill, OrgClosure, Tombstone
+from app.utils.loading import LOOKUP_FIELDS
+from app.utils.records import returning_columns
+
+# Row-level access rules, expressed as SQL predicates.
+#
+# Each *_scope(principal) returns a WHERE clause that is true exactly for
+# the rows that principal may read, so list endpoints filter with it
+# directly and detail endpoints can evaluate it alongside the row fetch.
+# Managers see their whole reporting subtree through org_closure.
+
+
+def _team(principal, include_self=True):
+    return OrgClosure.subtree_ids(principal.id, include_self=include_self)
+
+
+def user_scope(principal, include_self=True):
+    if principal.role == 'admin':
+        return true()
+    if principal.role == 'manager':
+        return User.id.in_(_team(principal, include_self))
+    return User.id == principal.id if include_self else false()
+
+
+def goal_scope(principal):
+    if principal.role == 'admin':
+        return true()
+    if principal.role == 'manager':
+        return Goal.employee_id.in_(_team(principal))
+    return Goal.employee_id == principal.id
+
+
+def review_scope(principal):
+    if principal.role == 'admin':
+        return true()
+    if principal.role == 'manager':
+        return or_(Review.reviewee_id.in_(_team(principal)), Review.reviewer_id == principal.id)
+    return or_(Review.reviewee_id == principal.id, Review.reviewer_id == principal.id)
+
+
+def skill_scope(principal):
+    if principal.role == 'admin':
+        return true()
+    if principal.role == 'manager':
+        return Skill.employee_id.in_(_team(principal))
+    return Skill.employee_id == principal.id
+
+
+def tombstone_scope(principal):
+    """Deleted rows the principal could read while they existed."""
+    if principal.role == 'admin':
+        return true()
+    if principal.role == 'manager':
+        return or_(Tombstone.employee_id.in_(_team(principal)), Tombstone.reviewer_id == principal.id)
+    return or_(Tombstone.employee_id == principal.id, Tombstone.reviewer_id == principal.id)
+
+
+def team_member_ids(principal):
+    """SELECT of the employees an analytics view aggregates over.
+
+    Admins get every active user; managers get their subtree, excluding
+    themselves.
+    """
+    if principal.role == 'admin':
+        return select(User.id).where(User.is_active == True)
+    return _team(principal, include_self=False)
+
+
+# Write access is narrower than read access: managers edit their direct
+# reports' rows (and their own), not their whole subtree.
+
+
+def _direct_reports(principal):
+    return select(User.id).where(User.manager_id == principal.id)
+
+
+def user_write_scope(principal):
+    if principal.role == 'admin':
+        return true()
+    return User.manager_id == principal.id
+
+
+def goal_write_scope(principal):
+    if principal.role == 'admin':
+        return true()
+    if principal.role == 'manager':
+        return or_(Goal.employee_id == principal.id, Goal.employee_id.in_(_direct_reports(principal)))
+    return Goal.employee_id == principal.id
+
+
+def review_write_scope(principal):
+    if principal.role == 'admin':
+        return true()
+    return Review.reviewer_id == principal.id
+
+
+def skill_write_scope(principal):
+    if principal.role == 'admin':
+        return true()
+    if principal.role == 'manager':
+        return or_(Skill.employee_id == principal.id, Skill.employee_id.in_(_direct_reports(principal)))
+    return Skill.employee_id == principal.id
+
+
+def update_scoped(model, row_id, scope, values, schema_cls):
+    """Apply values to one row if scope allows it, returning the new dump.
+
+    Sends a single UPDATE ... WHERE id = :id AND <scope> RETURNING the
+    dumped columns where the dialect supports RETURNING (PostgreSQL,
+    SQLite 3.35+), otherwise the UPDATE followed by one SELECT. Nothing is
+    reloaded through the ORM. Returns (record, found) like get_scoped:
+    (None, False) for a missing row, (None, True) when scope denies it.
+    Lookup fields in values are given by name and stored as their ID.
+    """
+    values = dict(values)
+    for field, relationship in LOOKUP_FIELDS.get(model, {}).items():
+        if field in values:
+            local, remote = relationship.property.local_remote_pairs[0]
+            values[local.key] = relationship.property.mapper.class_.id_for(values.pop(field))
+    
+    columns, serialize = returning_columns(model, schema_cls)
+    statement = update(model.__table__).where(model.id == row_id, scope).values(**values)
+
+    if db.session.get_bind().dialect.update_returning:
+        row = db.session.execute(statement.returning(*columns)).first()
+    else:
+        row = None
+        if db.session.execute(statement).rowcount:
+            row = db.session.execute(select(*columns).where(model.id == row_id)).first()
+
+    if row is None:
+        return None, db.session.query(exists().where(model.id == row_id)).scalar()
+    return serialize(row), True
@@ -0,0 +1,29 @@
+from flask import Response, current_app, request, stream_with_context
+from app.utils.pagination import keyset_order
+
+NDJSON = 'application/x-ndjson'
+
+
+def wants_ndjson():
+    """True when the client asked for newline-delimited JSON over JSON."""
+    return request.accept_mimetypes.best_match(['application/json', NDJSON]) == NDJSON
+
+
+def stream_ndjson(query, model, dump, sort=None):
+    """Stream every row of query as one JSON document per line.
+
+    Unlike the paginated JSON response this is not limited to one page:
+    it is meant for bulk consumers such as the nightly sync. Rows are
+    fetched NDJSON_BATCH_SIZE at a time from a server-side cursor
+    (yield_per) and serialized as they arrive, so memory stays flat and
+    the first line is sent before the query has finished. ?cursor= still
+    works to resume an interrupted stream after the last row received.
+    """
+    rows = keyset_order(query, model, sort).yield_per(current_app.config['NDJSON_BATCH_SIZE'])
+    dumps = current_app.json.dumps
+
+    def generate():
+        for row in rows:
+            yield dumps(dump(row)) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON)
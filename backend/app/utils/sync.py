@@ -0,0 +1,145 @@
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask import abort, current_app, jsonify, make_response
+from sqlalchemy import and_, or_
+from app import db
+from app.models import User, Goal, Review, Skill, Tombstone
+from app.schemas import UserSchema, GoalSchema, ReviewSchema, SkillSchema
+from app.utils.records import record_query
+from app.utils.scopes import user_scope, goal_scope, review_scope, skill_scope, tombstone_scope
+
+# Delta feed for GET /api/sync.
+#
+# Each feed is read in (updated_at, id) order, and the sync token records
+# the last (updated_at, id) a client received from every feed plus the
+# last tombstone, so a client only downloads rows written since its
+# previous call. Without a token the feeds start from the beginning, which
+# is the initial download. Rows come in batches of SYNC_BATCH_SIZE per
+# feed; has_more tells the client to call again straight away with the
+# new token.
+#
+# updated_at is stamped before a transaction commits, so a slow
+# transaction could commit a row older than a token that was already
+# handed out. Feeds therefore stop SYNC_SETTLE_SECONDS before the current
+# time, and the next call picks up what has settled since.
+#
+# Deletions come from the tombstones table, deactivated employees from
+# the employees feed; both are reported as IDs under "deleted".
+# Tombstones older than SYNC_TOMBSTONE_DAYS are pruned, so a token whose
+# tombstone position is older than that gets 410 and must start over.
+
+Feed = namedtuple('Feed', 'model schema scope active')
+
+FEEDS = {
+    'goals': Feed(Goal, GoalSchema, goal_scope, None),
+    'reviews': Feed(Review, ReviewSchema, review_scope, None),
+    'skills': Feed(Skill, SkillSchema, skill_scope, None),
+    'employees': Feed(User, UserSchema, user_scope, 'is_active'),
+}
+
+# Token key for the tombstones position
+DELETED = 'deleted'
+
+
+def _abort(code, message):
+    abort(make_response(jsonify({'message': message}), code))
+
+
+def encode_token(cursors):
+    payload = json.dumps({name: [value.isoformat(), row_id] for name, (value, row_id) in cursors.items()},
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    """{feed: (updated_at, id)} from a token; id is None for "everything up to updated_at"."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        cursors = {}
+        for name in (*FEEDS, DELETED):
+            value, row_id = payload[name]
+            cursors[name] = (datetime.fromisoformat(value), int(row_id) if row_id is not None else None)
+        return cursors
+    except (ValueError, TypeError, KeyError):
+        _abort(400, 'Invalid sync token')
+
+
+def _after(column, id_column, cursor):
+    value, row_id = cursor
+    if row_id is None:
+        return column > value
+    return or_(column > value, and_(column == value, id_column > row_id))
+
+
+def _read(query, column, id_column, cursor, horizon):
+    """One batch of query after cursor, the cursor after it and whether more remain."""
+    limit = current_app.config['SYNC_BATCH_SIZE']
+    query = query.filter(column <= horizon)
+    if cursor is not None:
+        query = query.filter(_after(column, id_column, cursor))
+    rows = query.order_by(column, id_column).limit(limit + 1).all()
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        return rows[:limit], (getattr(last, column.key), last.id), True
+    if cursor is not None and cursor[0] > horizon:
+        # The horizon went back (a longer settle time, a clock step); keep our place
+        return rows, cursor, False
+    # Everything up to the horizon has been read
+    return rows, (horizon, None), False
+
+
+def changes(principal, token=None):
+    """The next batch of rows principal can read that changed since token."""
+    config = current_app.config
+    now = datetime.utcnow()
+    horizon = now - timedelta(seconds=config['SYNC_SETTLE_SECONDS'])
+
+    if token is None:
+        # A fresh copy has nothing to delete
+        cursors = dict.fromkeys(FEEDS)
+        cursors[DELETED] = (horizon, None)
+    else:
+        cursors = decode_token(token)
+        if cursors[DELETED][0] < now - timedelta(days=config['SYNC_TOMBSTONE_DAYS']):
+            _abort(410, 'Sync token expired; sync again without since')
+
+    response = {}
+    deleted = {name: [] for name in FEEDS}
+    has_more = False
+    for name, feed in FEEDS.items():
+        model = feed.model
+        extra = ('updated_at',) + ((feed.active,) if feed.active else ())
+        query, serialize = record_query(model, feed.schema, extra=extra)
+        rows, cursors[name], more = _read(query.filter(feed.scope(principal)), model.updated_at,
+                                          model.id, cursors[name], horizon)
+        has_more = has_more or more
+        response[name] = []
+        for row in rows:
+            if feed.active is not None and not getattr(row, feed.active):
+                deleted[name].append(row.id)
+            else:
+                response[name].append(serialize(row))
+
+    query = db.session.query(Tombstone.id, Tombstone.resource_type, Tombstone.resource_id,
+                             Tombstone.deleted_at).filter(tombstone_scope(principal))
+    tombstones, cursors[DELETED], more = _read(query, Tombstone.deleted_at, Tombstone.id,
+                                               cursors[DELETED], horizon)
+    has_more = has_more or more
+    for tombstone in tombstones:
+        deleted[tombstone.resource_type].append(tombstone.resource_id)
+
+    response['deleted'] = deleted
+    response['token'] = encode_token(cursors)
+    response['has_more'] = has_more
+    return response
+
+
+def prune_tombstones():
+    """Delete tombstones older than SYNC_TOMBSTONE_DAYS; returns how many."""
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['SYNC_TOMBSTONE_DAYS'])
+    count = Tombstone.query.filter(Tombstone.deleted_at < cutoff).delete()
+    db.session.commit()
+    return count
@@ -0,0 +1,122 @@
+"""Compare sequential and concurrent analytics queries at realistic round-trip times.
+
+Seeds a throwaway SQLite database with one manager and --team reports, then
+times GET /api/analytics/dashboard and /api/analytics/team-comparison with
+the async engine disabled (statements run one after another on the
+request's session) and enabled (independent statements run concurrently).
+Every statement is delayed by --rtt milliseconds inside the driver to stand
+in for the network round trip to a database server; SQLite itself answers
+these queries in microseconds.
+
+    python benchmarks/async_analytics.py --rtt 0,1,5,20
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Goal, Review
+from app.utils.async_db import async_db
+
+ENDPOINTS = ('/api/analytics/dashboard', '/api/analytics/team-comparison')
+
+
+def round_trip(seconds):
+    """sqlite3 connection factory whose cursors wait `seconds` before each statement."""
+    class DelayedCursor(sqlite3.Cursor):
+        def execute(self, *args):
+            time.sleep(seconds)
+            return super().execute(*args)
+
+    class DelayedConnection(sqlite3.Connection):
+        def cursor(self, factory=DelayedCursor):
+            return super().cursor(factory)
+
+    return DelayedConnection
+
+
+def seed(team):
+    manager = User(email='manager@example.com', first_name='Mia', last_name='Manager', role='manager')
+    manager.set_password('password123')
+    db.session.add(manager)
+    db.session.commit()
+    for i in range(team):
+        employee = User(email=f'e{i}@example.com', password_hash='x', first_name=f'E{i}',
+                        last_name='Employee', role='employee', manager_id=manager.id,
+                        department=('Engineering', 'Sales', 'Support')[i % 3])
+        db.session.add(employee)
+        db.session.flush()
+        for j in range(5):
+            db.session.add(Goal(employee_id=employee.id, title=f'Goal {j}',
+                                status=('active', 'completed')[j % 2]))
+            db.session.add(Review(reviewee_id=employee.id, reviewer_id=manager.id,
+                                  review_type='manager', review_period=f'2024-Q{j + 1}',
+                                  overall_rating=j % 5 + 1, status='completed'))
+    db.session.commit()
+
+
+def measure(path, async_enabled, rtt, repeat):
+    app = create_app('testing', {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'factory': round_trip(rtt / 1000)}},
+        'ASYNC_DB_ENABLED': async_enabled,
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+    })
+    client = app.test_client()
+    response = client.post('/api/auth/login', content_type='application/json',
+                           data=json.dumps({'email': 'manager@example.com', 'password': 'password123'}))
+    headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+
+    timings = {}
+    for endpoint in ENDPOINTS:
+        client.get(endpoint, headers=headers)  # warm the pools and the principal cache
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            assert client.get(endpoint, headers=headers).status_code == 200
+            samples.append(time.perf_counter() - started)
+        timings[endpoint] = statistics.median(samples)
+    async_db.shutdown()
+    with app.app_context():
+        db.engine.dispose()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rtt', default='0,1,5,20', help='round-trip times in milliseconds')
+    parser.add_argument('--team', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+                                     'AUDIT_LOG_ASYNC': False})
+        with app.app_context():
+            db.create_all()
+            seed(args.team)
+            db.session.remove()
+            db.engine.dispose()
+
+        print(f"{'rtt ms':>6} {'endpoint':<32} {'sequential ms':>14} {'concurrent ms':>14} {'speedup':>8}")
+        for rtt in (float(ms) for ms in args.rtt.split(',')):
+            sequential = measure(path, False, rtt, args.repeat)
+            concurrent = measure(path, True, rtt, args.repeat)
+            for endpoint in ENDPOINTS:
+                print(f"{rtt:>6g} {endpoint:<32} {sequential[endpoint] * 1000:>14.1f} "
+                      f"{concurrent[endpoint] * 1000:>14.1f} "
+                      f"{sequential[endpoint] / concurrent[endpoint]:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
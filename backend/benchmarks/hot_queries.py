@@ -0,0 +1,108 @@
+"""Compare inline-built and cached statements for the per-request lookups.
+
+Seeds a throwaway in-memory SQLite database and times, per call, the
+lookups that run on (nearly) every request: the principal load behind
+current_user, the login lookup by email, the revoked-token check and a
+scoped detail fetch. "inline" builds the statement in the call the way the
+views used to; "cached" goes through app.utils.queries, which builds each
+statement once and only binds values per call.
+
+    python benchmarks/hot_queries.py --repeat 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import case, select
+
+from app import create_app, db
+from app.models import User, Goal, RevokedToken
+from app.utils import queries
+
+
+def seed():
+    manager = User(email='manager@example.com', password_hash='x', first_name='Mia',
+                   last_name='Manager', role='manager')
+    db.session.add(manager)
+    db.session.flush()
+    employee = User(email='employee@example.com', password_hash='x', first_name='Eve',
+                    last_name='Employee', role='employee', manager_id=manager.id)
+    db.session.add(employee)
+    db.session.flush()
+    goal = Goal(employee_id=employee.id, title='Ship it', status='active')
+    db.session.add(goal)
+    db.session.commit()
+    return manager, goal.id
+
+
+def inline_lookups(manager, goal_id):
+    from app.utils.loading import load_options
+    from app.utils.scopes import goal_scope
+
+    def principal():
+        return db.session.query(
+            User.id, User.role, User.is_active, User.manager_id
+        ).filter(User.id == manager.id).first()
+
+    def login():
+        return User.query.filter_by(email='manager@example.com', is_active=True).first()
+
+    def revoked():
+        return db.session.query(
+            RevokedToken.query.filter_by(jti='not-revoked').exists()
+        ).scalar()
+
+    def detail():
+        statement = (select(Goal, case((goal_scope(manager), True), else_=False).label('allowed'))
+                     .options(*load_options(Goal))
+                     .where(Goal.id == goal_id))
+        return db.session.execute(statement).first()
+
+    return {'principal': principal, 'login': login, 'revoked': revoked, 'detail': detail}
+
+
+def cached_lookups(manager, goal_id):
+    from app.utils.scopes import goal_scope
+
+    return {
+        'principal': lambda: queries.principal_row(manager.id),
+        'login': lambda: queries.active_user_by_email('manager@example.com'),
+        'revoked': lambda: queries.token_revoked('not-revoked'),
+        'detail': lambda: queries.get_scoped(Goal, goal_id, goal_scope, manager),
+    }
+
+
+def per_call(fn, repeat):
+    fn()  # warm the compiled cache
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+        db.session.expunge_all()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+                                 'AUDIT_LOG_ASYNC': False})
+    with app.app_context():
+        db.create_all()
+        manager, goal_id = seed()
+        inline = inline_lookups(manager, goal_id)
+        cached = cached_lookups(manager, goal_id)
+
+        print(f"{'lookup':<10} {'inline µs':>10} {'cached µs':>10} {'speedup':>8}")
+        for name in inline:
+            before = per_call(inline[name], args.repeat)
+            after = per_call(cached[name], args.repeat)
+            print(f'{name:<10} {before * 1e6:>10.1f} {after * 1e6:>10.1f} {before / after:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Compare the ORM and record read paths for list endpoints.
+
+Seeds a throwaway SQLite database with --rows goals and reviews, then times
+loading and serializing every row both ways: ORM instances dumped through
+marshmallow (the old list path) and column rows dumped by
+app.utils.records (the current one). Peak Python allocation for each path
+is measured in a separate tracemalloc run so it does not skew the timings.
+
+    python benchmarks/list_serialization.py --rows 10000,100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Goal, GoalCategory, Review
+from app.schemas import GoalSchema, ReviewSchema
+from app.utils.loading import load_options
+from app.utils.records import record_query
+
+USERS = 200
+
+
+def seed(rows):
+    start = datetime(2024, 1, 1)
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'email': f'user{i}@example.com', 'password_hash': 'x',
+         'first_name': f'First{i}', 'last_name': f'Last{i}', 'role': 'employee',
+         'is_active': True, 'created_at': start}
+        for i in range(1, USERS + 1)
+    ])
+    db.session.execute(GoalCategory.__table__.insert(), [{'id': 1, 'name': 'Delivery', 'key': 'delivery'}])
+    db.session.execute(Goal.__table__.insert(), [
+        {'employee_id': random.randint(1, USERS), 'title': f'Goal {i}',
+         'description': 'Ship the thing. ' * 20, 'category_id': 1,
+         'status': 'active', 'progress': i % 100, 'manager_approved': bool(i % 2),
+         'target_date': (start + timedelta(days=i % 365)).date(),
+         'created_at': start + timedelta(seconds=i), 'updated_at': start}
+        for i in range(rows)
+    ])
+    db.session.execute(Review.__table__.insert(), [
+        {'reviewee_id': random.randint(1, USERS), 'reviewer_id': random.randint(1, USERS),
+         'review_type': 'manager', 'review_period': '2024-Q1', 'overall_rating': i % 5 + 1,
+         'comments': 'Solid quarter. ' * 20, 'status': 'submitted',
+         'created_at': start + timedelta(seconds=i), 'updated_at': start}
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def orm_path(model, schema_cls):
+    rows = (model.query.options(*load_options(model))
+            .order_by(model.created_at, model.id).all())
+    return schema_cls(many=True).dump(rows)
+
+
+def record_path(model, schema_cls):
+    query, serialize = record_query(model, schema_cls)
+    return [serialize(row) for row in query.order_by(model.created_at, model.id)]
+
+
+def measure(path, model, schema_cls, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.perf_counter()
+        path(model, schema_cls)
+        best = min(best, time.perf_counter() - started)
+
+    db.session.remove()
+    tracemalloc.start()
+    path(model, schema_cls)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'model':<7} {'orm s':>8} {'records s':>10} {'speedup':>8} "
+          f"{'orm MiB':>8} {'records MiB':>12} {'saved':>6}")
+    for rows in (int(n) for n in args.rows.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            app = create_app('testing', {
+                'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                'AUDIT_LOG_ASYNC': False,
+                'RAISE_ON_LAZY_LOAD': False,
+            })
+            with app.app_context():
+                db.create_all()
+                seed(rows)
+                for model, schema_cls in ((Goal, GoalSchema), (Review, ReviewSchema)):
+                    orm_time, orm_peak = measure(orm_path, model, schema_cls, args.repeat)
+                    rec_time, rec_peak = measure(record_path, model, schema_cls, args.repeat)
+                    print(f"{rows:>7} {model.__name__:<7} {orm_time:>8.3f} {rec_time:>10.3f} "
+                          f"{orm_time / rec_time:>7.1f}x {orm_peak / 2**20:>8.1f} "
+                          f"{rec_peak / 2**20:>12.1f} {1 - rec_peak / orm_peak:>6.0%}")
+                db.session.remove()
+                db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
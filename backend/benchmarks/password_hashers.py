@@ -0,0 +1,56 @@
+"""Measure password hashing throughput per scheme.
+
+Runs each registered hasher with the configured policy parameters on
+--processes cores for --duration seconds and reports hashes per second per
+core, which is what login capacity has to be sized against.
+
+    python benchmarks/password_hashers.py --processes 4 --duration 3
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.utils.passwords import HASHERS, encode_password
+
+
+def hash_for(scheme, params, duration):
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        encode_password('correct horse battery staple', scheme, params)
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--schemes', default=','.join(HASHERS))
+    args = parser.parse_args()
+
+    app = create_app()
+    policy = app.config['PASSWORD_HASH_PARAMS']
+
+    print(f"{'scheme':<8} {'params':<40} {'hashes/s':>10} {'per core':>10} {'ms/hash':>9}")
+    with ProcessPoolExecutor(max_workers=args.processes) as pool:
+        for scheme in args.schemes.split(','):
+            params = {**HASHERS[scheme].defaults, **policy.get(scheme, {})}
+            futures = [
+                pool.submit(hash_for, scheme, params, args.duration)
+                for _ in range(args.processes)
+            ]
+            total = sum(f.result() for f in futures)
+            rate = total / args.duration
+            per_core = rate / args.processes
+            print(f"{scheme:<8} {str(params):<40} {rate:>10.1f} {per_core:>10.1f} "
+                  f"{1000 / per_core if per_core else float('inf'):>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
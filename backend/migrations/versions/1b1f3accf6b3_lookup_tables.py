@@ -0,0 +1,147 @@
+"""lookup tables
+
+Revision ID: 1b1f3accf6b3
+Revises: 7256081baae1
+Create Date: 2026-10-18 00:57:51.099696
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b1f3accf6b3'
+down_revision = '7256081baae1'
+branch_labels = None
+depends_on = None
+
+# (lookup table, table, text column, foreign key column, NOT NULL)
+ENCODED = (
+    ('departments', 'users', 'department', 'department_id', False),
+    ('goal_categories', 'goals', 'category', 'category_id', False),
+    ('skill_names', 'skills', 'skill_name', 'skill_name_id', True),
+    ('skill_categories', 'skills', 'category', 'category_id', False),
+)
+
+
+def _create_lookup(name):
+    op.create_table(name,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+
+
+def _encode(lookup, table, column, foreign_key, required):
+    """Copy the distinct values of table.column into lookup and point foreign_key at them.
+
+    Values that differ only in case or whitespace share one row, named
+    after the most common spelling. Blank values become NULL unless the
+    column is required.
+    """
+    bind = op.get_bind()
+    lookup_table = sa.table(lookup, sa.column('id', sa.Integer), sa.column('name'), sa.column('key'))
+    counts = bind.execute(sa.text(
+        f'SELECT {column}, count(*) FROM {table} WHERE {column} IS NOT NULL GROUP BY {column}'
+    )).all()
+
+    variants = {}
+    for value, count in counts:
+        display = ' '.join(value.split())
+        if display or required:
+            variants.setdefault(display.casefold(), []).append((-count, display, value))
+
+    for key, spellings in sorted(variants.items()):
+        spellings.sort()
+        bind.execute(lookup_table.insert().values(name=spellings[0][1], key=key))
+        lookup_id = bind.execute(
+            sa.select(lookup_table.c.id).where(lookup_table.c.key == key)
+        ).scalar_one()
+        bind.execute(
+            sa.text(f'UPDATE {table} SET {foreign_key} = :id WHERE {column} = :value'),
+            [{'id': lookup_id, 'value': value} for _, _, value in spellings]
+        )
+
+
+def _decode(lookup, table, column, foreign_key, required):
+    op.execute(
+        f'UPDATE {table} SET {column} = '
+        f'(SELECT name FROM {lookup} WHERE {lookup}.id = {table}.{foreign_key})'
+    )
+
+
+def upgrade():
+    for lookup in ('departments', 'goal_categories', 'skill_categories', 'skill_names'):
+        _create_lookup(lookup)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('department_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_users_department_id_departments', 'departments', ['department_id'], ['id'])
+
+    with op.batch_alter_table('goals', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_goals_category_id_goal_categories', 'goal_categories', ['category_id'], ['id'])
+
+    with op.batch_alter_table('skills', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('skill_name_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_skills_skill_name_id_skill_names', 'skill_names', ['skill_name_id'], ['id'])
+        batch_op.create_foreign_key('fk_skills_category_id_skill_categories', 'skill_categories', ['category_id'], ['id'])
+
+    # Deduplicate the existing free-text values into the lookup tables
+    for encoded in ENCODED:
+        _encode(*encoded)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_department_id', ['department_id'], unique=False)
+        batch_op.drop_column('department')
+
+    with op.batch_alter_table('goals', schema=None) as batch_op:
+        batch_op.drop_index('ix_goals_category')
+        batch_op.create_index('ix_goals_category_id', ['category_id'], unique=False)
+        batch_op.drop_column('category')
+
+    with op.batch_alter_table('skills', schema=None) as batch_op:
+        batch_op.alter_column('skill_name_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_index('ix_skills_skill_name_category')
+        batch_op.create_index('ix_skills_skill_name_id_category_id', ['skill_name_id', 'category_id'], unique=False)
+        batch_op.drop_column('skill_name')
+        batch_op.drop_column('category')
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('department', sa.VARCHAR(length=100), nullable=True))
+
+    with op.batch_alter_table('goals', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('category', sa.VARCHAR(length=50), nullable=True))
+
+    with op.batch_alter_table('skills', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('skill_name', sa.VARCHAR(length=100), nullable=True))
+        batch_op.add_column(sa.Column('category', sa.VARCHAR(length=50), nullable=True))
+
+    for encoded in ENCODED:
+        _decode(*encoded)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_department_id')
+        batch_op.drop_column('department_id')
+
+    with op.batch_alter_table('goals', schema=None) as batch_op:
+        batch_op.drop_index('ix_goals_category_id')
+        batch_op.create_index('ix_goals_category', ['category'], unique=False)
+        batch_op.drop_column('category_id')
+
+    with op.batch_alter_table('skills', schema=None) as batch_op:
+        batch_op.alter_column('skill_name', existing_type=sa.VARCHAR(length=100), nullable=False)
+        batch_op.drop_index('ix_skills_skill_name_id_category_id')
+        batch_op.create_index('ix_skills_skill_name_category', ['skill_name', 'category'], unique=False)
+        batch_op.drop_column('category_id')
+        batch_op.drop_column('skill_name_id')
+
+    op.drop_table('skill_names')
+    op.drop_table('skill_categories')
+    op.drop_table('goal_categories')
+    op.drop_table('departments')
@@ -0,0 +1,104 @@
+import pytest
+import json
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Goal, Review
+from app.utils.async_db import async_db
+
+def make_app(tmp_path, async_enabled):
+    return create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'analytics.db'}",
+        'ASYNC_DB_ENABLED': async_enabled,
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+        'PASSWORD_HASH_SCHEME': 'pbkdf2',
+        'PASSWORD_HASH_PARAMS': {'pbkdf2': {'iterations': 1000}}
+    })
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path, True)
+    with app.app_context():
+        db.create_all()
+        manager = User(email='manager@example.com', first_name='Mia', last_name='Manager',
+                       role='manager', department='Engineering')
+        manager.set_password('password123')
+        db.session.add(manager)
+        db.session.commit()
+        for i in range(3):
+            employee = User(email=f'e{i}@example.com', first_name=f'E{i}', last_name='Employee',
+                            role='employee', manager_id=manager.id, password_hash='x',
+                            department='Engineering' if i else 'Sales')
+            db.session.add(employee)
+            db.session.flush()
+            for j in range(i + 1):
+                db.session.add(Goal(employee_id=employee.id, title=f'Goal {j}',
+                                    status='completed' if j else 'active'))
+                db.session.add(Review(reviewee_id=employee.id, reviewer_id=manager.id,
+                                      review_type='manager', review_period=f'2024-Q{j + 1}',
+                                      overall_rating=j + 2, status='completed'))
+        db.session.commit()
+        yield app
+        async_db.shutdown()
+        db.drop_all()
+
+def login(client):
+    response = client.post('/api/auth/login',
+                          data=json.dumps({'email': 'manager@example.com', 'password': 'password123'}),
+                          content_type='application/json')
+    return {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+@pytest.mark.parametrize('endpoint', ['/api/analytics/dashboard', '/api/analytics/team-comparison'])
+def test_async_views_match_the_sync_fallback(app, tmp_path, endpoint):
+    assert async_db.enabled
+    client = app.test_client()
+    headers = login(client)
+    
+    with count_statements(async_db._engines[None].sync_engine) as statements:
+        response = client.get(endpoint, headers=headers)
+    assert response.status_code == 200
+    assert len(statements) >= 3
+    concurrent = json.loads(response.data)
+    
+    sync_app = make_app(tmp_path, False)
+    assert not async_db.enabled
+    sync_client = sync_app.test_client()
+    response = sync_client.get(endpoint, headers=login(sync_client))
+    assert json.loads(response.data) == concurrent
+
+def test_team_comparison_reads_the_whole_team_at_once(app):
+    client = app.test_client()
+    response = client.get('/api/analytics/team-comparison', headers=login(client))
+    
+    team = json.loads(response.data)['team_data']
+    assert [(e['employee_name'], e['department'], e['total_goals'], e['goal_completion_rate'],
+             e['overall_rating']) for e in team] == [
+        ('E0 Employee', 'Sales', 1, 0, 2),
+        ('E1 Employee', 'Engineering', 2, 50.0, 3),
+        ('E2 Employee', 'Engineering', 3, 66.67, 4),
+    ]
+
+def test_async_engine_has_its_own_pool(app):
+    # As engine_options() sets them for PostgreSQL
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': 10, 'max_overflow': 20}
+    app.config['ASYNC_DB_POOL_SIZE'] = 3
+    app.config['ASYNC_DB_MAX_OVERFLOW'] = 1
+    async_db.init_app(app, db)
+    
+    pool = async_db._engines[None].sync_engine.pool
+    assert pool.size() == 3
+    assert pool._max_overflow == 1
@@ -0,0 +1,110 @@
+import pytest
+import json
+import time
+from app import create_app, db
+from app.models import User, AuditLog
+from app.utils.audit_writer import audit_writer
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'audit.db'}",
+        'AUDIT_FLUSH_INTERVAL': 0.05,
+        'LOGIN_RATE_LIMIT_ENABLED': False
+    })
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        audit_writer.shutdown()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    user = User(
+        email='admin@example.com',
+        first_name='Admin',
+        last_name='User',
+        role='admin'
+    )
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    
+    response = client.post('/api/auth/login',
+                          data=json.dumps({
+                              'email': 'admin@example.com',
+                              'password': 'password123'
+                          }),
+                          content_type='application/json')
+    
+    token = json.loads(response.data)['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+def test_audited_requests_are_written_in_background(client, auth_headers):
+    for _ in range(5):
+        assert client.get('/api/employees', headers=auth_headers).status_code == 200
+    
+    audit_writer.shutdown()
+    
+    logs = AuditLog.query.filter_by(action='list_employees').all()
+    assert len(logs) == 5
+    assert logs[0].details == {'endpoint': 'employees.get_employees', 'method': 'GET'}
+    assert audit_writer.stats()['written'] == 5
+    assert audit_writer.stats()['queue_depth'] == 0
+
+def test_full_queue_drops_events(app, monkeypatch):
+    app.config['AUDIT_QUEUE_SIZE'] = 2
+    audit_writer.init_app(app)
+    # Hold the writer thread back so the queue fills up
+    monkeypatch.setattr(audit_writer, '_ensure_started', lambda: None)
+    
+    for _ in range(5):
+        audit_writer.enqueue(user_id=None, action='noop')
+    
+    assert audit_writer.stats()['queue_depth'] == 2
+    assert audit_writer.stats()['dropped'] == 3
+    
+    audit_writer.flush()
+    assert AuditLog.query.filter_by(action='noop').count() == 2
+
+def test_lost_events_are_logged(app, monkeypatch, caplog):
+    app.config['AUDIT_QUEUE_SIZE'] = 1
+    audit_writer.init_app(app)
+    monkeypatch.setattr(audit_writer, '_ensure_started', lambda: None)
+    
+    for _ in range(3):
+        audit_writer.enqueue(user_id=None, action='noop')
+    audit_writer.report()
+    
+    warnings = [r.getMessage() for r in caplog.records if r.levelname == 'WARNING']
+    assert warnings == ['Audit log lost events: 2 dropped (queue full), 0 failed to write '
+                        '(2 and 0 since start); queue 1/1']
+    
+    # Nothing new, nothing logged
+    caplog.clear()
+    audit_writer.report()
+    assert not caplog.records
+    
+    # The writer thread reports by itself once per flush interval
+    audit_writer.flush()
+    monkeypatch.undo()
+    audit_writer.dropped += 1
+    audit_writer.enqueue(user_id=None, action='noop')
+    deadline = time.monotonic() + 2
+    while 'lost events: 1 dropped' not in caplog.text and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 'Audit log lost events: 1 dropped (queue full)' in caplog.text
+
+def test_synchronous_mode_writes_inline(client, app, auth_headers):
+    app.config['AUDIT_LOG_ASYNC'] = False
+    app.config['LOGIN_RATE_LIMIT_ENABLED'] = False
+    
+    client.get('/api/employees', headers=auth_headers)
+    
+    assert AuditLog.query.filter_by(action='list_employees').count() == 1
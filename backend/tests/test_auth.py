@@ -5,9 +5,12 @@ from app.models import User
 
 @pytest.fixture
 def app():
-    app = create_app('testing')
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False
+    })
     
     with app.app_context():
         db.create_all()
@@ -84,4 +87,236 @@ def test_get_current_user(client, auth_headers):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data['email'] == 'test@example.com'
-    assert data['first_name'] == 'Test'
\ No newline at end of file
+    assert data['first_name'] == 'Test'
+
+def test_login_returns_503_when_hashing_saturated(client, monkeypatch):
+    from app.utils.hashing import hashing, HashingUnavailable
+    
+    user = User(
+        email='test@example.com',
+        first_name='Test',
+        last_name='User',
+        role='employee'
+    )
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    
+    def saturated(*args):
+        raise HashingUnavailable('Password hashing queue is full')
+    monkeypatch.setattr(hashing, 'check_password', saturated)
+    
+    response = client.post('/api/auth/login',
+                          data=json.dumps({
+                              'email': 'test@example.com',
+                              'password': 'password123'
+                          }),
+                          content_type='application/json')
+    
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+def test_hashing_recovers_after_pool_worker_dies(app):
+    import os
+    import signal
+    from app.utils.hashing import hashing, HashingUnavailable
+    
+    app.config['PASSWORD_HASH_WORKERS'] = 1
+    app.config['PASSWORD_HASH_SCHEME'] = 'pbkdf2'
+    app.config['PASSWORD_HASH_PARAMS'] = {'pbkdf2': {'iterations': 1000}}
+    try:
+        pwhash = hashing.hash_password('password123')
+        
+        # Kill the child as the OOM killer would
+        for process in list(hashing._executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join(5)
+        
+        with pytest.raises(HashingUnavailable):
+            hashing.check_password(pwhash, 'password123')
+        assert hashing.check_password(pwhash, 'password123')
+    finally:
+        hashing.shutdown()
+
+def test_login_rehashes_password_with_outdated_policy(client, app):
+    app.config['PASSWORD_HASH_SCHEME'] = 'pbkdf2'
+    app.config['PASSWORD_HASH_PARAMS'] = {'pbkdf2': {'iterations': 1000}}
+    user = User(
+        email='test@example.com',
+        first_name='Test',
+        last_name='User',
+        role='employee'
+    )
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+    
+    app.config['PASSWORD_HASH_SCHEME'] = 'bcrypt'
+    app.config['PASSWORD_HASH_PARAMS'] = {'bcrypt': {'rounds': 4}}
+    assert user.password_needs_rehash()
+    
+    response = client.post('/api/auth/login',
+                          data=json.dumps({
+                              'email': 'test@example.com',
+                              'password': 'password123'
+                          }),
+                          content_type='application/json')
+    
+    assert response.status_code == 200
+    db.session.refresh(user)
+    assert user.password_hash.startswith('$2b$04$')
+    assert not user.password_needs_rehash()
+    assert user.check_password('password123')
+
+def test_refresh_issues_new_access_token(client):
+    user = User(
+        email='test@example.com',
+        first_name='Test',
+        last_name='User',
+        role='employee'
+    )
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    
+    response = client.post('/api/auth/login',
+                          data=json.dumps({
+                              'email': 'test@example.com',
+                              'password': 'password123'
+                          }),
+                          content_type='application/json')
+    refresh_token = json.loads(response.data)['refresh_token']
+    
+    # Refresh tokens are not accepted as access tokens
+    response = client.get('/api/auth/me',
+                         headers={'Authorization': f'Bearer {refresh_token}'})
+    assert response.status_code == 422
+    
+    response = client.post('/api/auth/refresh',
+                          headers={'Authorization': f'Bearer {refresh_token}'})
+    assert response.status_code == 200
+    access_token = json.loads(response.data)['access_token']
+    
+    response = client.get('/api/auth/me',
+                         headers={'Authorization': f'Bearer {access_token}'})
+    assert response.status_code == 200
+
+def test_logout_revokes_token(client, auth_headers):
+    from app.utils.revocation import revocation_list
+    
+    assert client.get('/api/auth/me', headers=auth_headers).status_code == 200
+    
+    response = client.post('/api/auth/logout', headers=auth_headers)
+    assert response.status_code == 200
+    
+    response = client.get('/api/auth/me', headers=auth_headers)
+    assert response.status_code == 401
+    assert json.loads(response.data)['msg'] == 'Token has been revoked'
+    
+    # A fresh filter built from the database still knows the token
+    revocation_list.rebuild()
+    assert client.get('/api/auth/me', headers=auth_headers).status_code == 401
+
+def test_revoking_a_token_twice_is_harmless(client, auth_headers):
+    from flask_jwt_extended import decode_token
+    from app.models import RevokedToken
+    from app.utils.revocation import revocation_list
+    
+    payload = decode_token(auth_headers['Authorization'].split()[1])
+    revocation_list.revoke(payload)
+    revocation_list.revoke(payload)
+    
+    assert RevokedToken.query.filter_by(jti=payload['jti']).count() == 1
+    assert client.get('/api/auth/me', headers=auth_headers).status_code == 401
+
+def test_revocation_survives_a_concurrent_rebuild(client, auth_headers, monkeypatch):
+    from flask_jwt_extended import decode_token
+    from app.utils.revocation import revocation_list
+    
+    payload = decode_token(auth_headers['Authorization'].split()[1])
+    revocation_list.rebuild()
+    read_jtis = revocation_list._unexpired_jtis
+    
+    def read_then_revoke():
+        # The rebuild reads the table just before the logout commits
+        jtis = read_jtis()
+        revocation_list.revoke(payload)
+        return jtis
+    monkeypatch.setattr(revocation_list, '_unexpired_jtis', read_then_revoke)
+    revocation_list.rebuild()
+    monkeypatch.undo()
+    
+    assert client.get('/api/auth/me', headers=auth_headers).status_code == 401
+    
+    # The next rebuild reads it from the table and stops carrying it
+    revocation_list.rebuild()
+    assert not revocation_list._pending
+    assert client.get('/api/auth/me', headers=auth_headers).status_code == 401
+
+def test_login_throttled_per_email_before_hashing(client, app, tmp_path, monkeypatch):
+    from app.utils.hashing import hashing
+    
+    app.config['LOGIN_RATE_LIMIT_ENABLED'] = True
+    app.config['LOGIN_RATE_LIMIT_DB'] = str(tmp_path / 'throttle.sqlite3')
+    app.config['LOGIN_EMAIL_BURST'] = 2
+    app.config['LOGIN_EMAIL_RATE'] = 0.01
+    
+    calls = []
+    monkeypatch.setattr(hashing, 'check_password', lambda *args: calls.append(args) or False)
+    user = User(
+        email='test@example.com',
+        first_name='Test',
+        last_name='User',
+        role='employee'
+    )
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    
+    statuses = []
+    for _ in range(3):
+        response = client.post('/api/auth/login',
+                              data=json.dumps({
+                                  'email': 'test@example.com',
+                                  'password': 'wrongpassword'
+                              }),
+                              content_type='application/json')
+        statuses.append(response.status_code)
+    
+    assert statuses == [401, 401, 429]
+    assert len(calls) == 2
+    assert int(response.headers['Retry-After']) > 0
+
+def test_login_throttle_keys_on_forwarded_client_address(tmp_path):
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUDIT_LOG_ASYNC': False,
+        'PASSWORD_HASH_WORKERS': 0,
+        'PROXY_FIX_X_FOR': 1,
+        'LOGIN_RATE_LIMIT_DB': str(tmp_path / 'throttle.sqlite3'),
+        'LOGIN_IP_BURST': 1,
+        'LOGIN_IP_RATE': 0.01
+    })
+    client = app.test_client()
+    
+    def attempt(forwarded_for):
+        response = client.post('/api/auth/login',
+                              data=json.dumps({
+                                  'email': 'nonexistent@example.com',
+                                  'password': 'wrongpassword'
+                              }),
+                              content_type='application/json',
+                              headers={'X-Forwarded-For': forwarded_for},
+                              environ_base={'REMOTE_ADDR': '10.0.0.1'})
+        return response.status_code
+    
+    with app.app_context():
+        db.create_all()
+        # Clients behind the same balancer get their own buckets
+        assert attempt('203.0.113.1') == 401
+        assert attempt('203.0.113.2') == 401
+        # Entries a client adds in front of the balancer's are not trusted
+        assert attempt('198.51.100.7, 203.0.113.1') == 429
+        db.drop_all()
@@ -0,0 +1,210 @@
+import pytest
+import json
+from app import create_app, db
+from app.models import User, OrgClosure
+from app.utils.principal_cache import Principal, PrincipalCache, principal_cache
+
+@pytest.fixture
+def app():
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False
+    })
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def create_user(email, role, **kwargs):
+    user = User(
+        email=email,
+        first_name=role.title(),
+        last_name='User',
+        role=role,
+        **kwargs
+    )
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def login(client, email):
+    response = client.post('/api/auth/login',
+                          data=json.dumps({
+                              'email': email,
+                              'password': 'password123'
+                          }),
+                          content_type='application/json')
+    token = json.loads(response.data)['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+def test_role_required_caches_principal(client):
+    employee = create_user('employee@example.com', 'employee')
+    headers = login(client, 'employee@example.com')
+    
+    response = client.get('/api/goals', headers=headers)
+    
+    assert response.status_code == 200
+    principal = principal_cache.get(employee.id)
+    assert principal.role == 'employee'
+    assert principal.is_active
+
+def test_deactivate_employee_revokes_access_immediately(client):
+    create_user('admin@example.com', 'admin')
+    employee = create_user('employee@example.com', 'employee')
+    admin_headers = login(client, 'admin@example.com')
+    employee_headers = login(client, 'employee@example.com')
+    
+    assert client.get('/api/goals', headers=employee_headers).status_code == 200
+    
+    response = client.delete(f'/api/employees/{employee.id}', headers=admin_headers)
+    assert response.status_code == 200
+    
+    response = client.get('/api/goals', headers=employee_headers)
+    assert response.status_code == 401
+
+def test_deactivation_clears_other_workers_caches(client, app, tmp_path):
+    app.config['PRINCIPAL_CACHE_DB'] = str(tmp_path / 'principals.sqlite3')
+    create_user('admin@example.com', 'admin')
+    employee = create_user('employee@example.com', 'employee')
+    admin_headers = login(client, 'admin@example.com')
+    
+    # Another worker on the same host that has already cached the employee
+    other_worker = PrincipalCache()
+    other_worker.init_app(app)
+    generation = other_worker.generation()
+    assert other_worker.get(employee.id, generation) is None
+    other_worker.set(Principal(employee.id, 'employee', True, None), generation)
+    assert other_worker.get(employee.id).is_active
+    
+    response = client.delete(f'/api/employees/{employee.id}', headers=admin_headers)
+    assert response.status_code == 200
+    
+    assert other_worker.get(employee.id) is None
+
+def test_update_employee_refreshes_cached_role(client):
+    create_user('admin@example.com', 'admin')
+    employee = create_user('employee@example.com', 'employee')
+    admin_headers = login(client, 'admin@example.com')
+    employee_headers = login(client, 'employee@example.com')
+    
+    assert client.get('/api/employees', headers=employee_headers).status_code == 403
+    
+    response = client.put(f'/api/employees/{employee.id}',
+                         data=json.dumps({'role': 'manager'}),
+                         content_type='application/json',
+                         headers=admin_headers)
+    assert response.status_code == 200
+    
+    assert client.get('/api/employees', headers=employee_headers).status_code == 200
+
+def test_create_employee_hashes_password_in_pool(client, app):
+    app.config['PASSWORD_HASH_WORKERS'] = 1
+    create_user('admin@example.com', 'admin')
+    admin_headers = login(client, 'admin@example.com')
+    
+    response = client.post('/api/employees',
+                          data=json.dumps({
+                              'email': 'new@example.com',
+                              'password': 'password123',
+                              'first_name': 'New',
+                              'last_name': 'Hire',
+                              'role': 'employee'
+                          }),
+                          content_type='application/json',
+                          headers=admin_headers)
+    assert response.status_code == 201
+    
+    user = User.query.filter_by(email='new@example.com').first()
+    assert user.check_password('password123')
+    assert login(client, 'new@example.com')
+
+def test_patch_employee_moves_subtree(client):
+    create_user('admin@example.com', 'admin')
+    old_manager = create_user('old@example.com', 'manager')
+    new_manager = create_user('new@example.com', 'manager')
+    employee = create_user('employee@example.com', 'employee', manager_id=old_manager.id)
+    headers = login(client, 'admin@example.com')
+    
+    response = client.patch(f'/api/employees/{employee.id}',
+                            data=json.dumps({'manager_id': new_manager.id, 'id': 999}),
+                            content_type='application/json',
+                            headers=headers)
+    assert response.status_code == 400
+    assert db.session.get(User, employee.id).manager_id == old_manager.id
+    
+    response = client.patch(f'/api/employees/{employee.id}',
+                            data=json.dumps({'manager_id': new_manager.id}),
+                            content_type='application/json',
+                            headers=headers)
+    
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['id'] == employee.id
+    assert data['full_name'] == 'Employee User'
+    assert db.session.get(User, employee.id).manager_id == new_manager.id
+    assert OrgClosure.contains(new_manager.id, employee.id)
+    assert not OrgClosure.contains(old_manager.id, employee.id)
+
+def test_patch_employee_clears_manager(client):
+    create_user('admin@example.com', 'admin')
+    manager = create_user('manager@example.com', 'manager')
+    employee = create_user('employee@example.com', 'employee', manager_id=manager.id)
+    report = create_user('report@example.com', 'employee', manager_id=employee.id)
+    headers = login(client, 'admin@example.com')
+    
+    response = client.patch(f'/api/employees/{employee.id}',
+                            data=json.dumps({'manager_id': None}),
+                            content_type='application/json',
+                            headers=headers)
+    
+    assert response.status_code == 200
+    assert db.session.get(User, employee.id).manager_id is None
+    assert not OrgClosure.contains(manager.id, employee.id)
+    assert not OrgClosure.contains(manager.id, report.id)
+    assert OrgClosure.contains(employee.id, report.id)
+
+def test_patch_employee_outside_direct_reports_is_forbidden(client):
+    create_user('manager@example.com', 'manager')
+    other = create_user('other@example.com', 'employee')
+    headers = login(client, 'manager@example.com')
+    
+    response = client.patch(f'/api/employees/{other.id}',
+                            data=json.dumps({'position': 'Lead'}),
+                            content_type='application/json',
+                            headers=headers)
+    assert response.status_code == 403
+    
+    response = client.patch('/api/employees/999',
+                            data=json.dumps({'position': 'Lead'}),
+                            content_type='application/json',
+                            headers=headers)
+    assert response.status_code == 404
+    
+    response = client.patch(f'/api/employees/{other.id}',
+                            data=json.dumps({'role': 'owner'}),
+                            content_type='application/json',
+                            headers=headers)
+    assert response.status_code == 400
+
+def test_deactivated_employee_can_be_reactivated(client):
+    create_user('admin@example.com', 'admin')
+    employee = create_user('employee@example.com', 'employee')
+    headers = login(client, 'admin@example.com')
+    
+    assert client.delete(f'/api/employees/{employee.id}', headers=headers).status_code == 200
+    response = client.put(f'/api/employees/{employee.id}',
+                          data=json.dumps({'is_active': True}),
+                          content_type='application/json',
+                          headers=headers)
+    
+    assert response.status_code == 200
+    assert json.loads(response.data)['is_active'] is True
+    assert login(client, 'employee@example.com')
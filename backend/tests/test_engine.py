@@ -0,0 +1,59 @@
+import pytest
+import logging
+from app import create_app, db
+from app.utils.engine import engine_options
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'engine.db'}",
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False
+    })
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+def pragma(connection, name):
+    return connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+def test_sqlite_connections_get_the_configured_pragmas(app):
+    with db.engine.connect() as connection:
+        assert pragma(connection, 'journal_mode') == 'wal'
+        assert pragma(connection, 'synchronous') == 1  # NORMAL
+        assert pragma(connection, 'busy_timeout') == 5000
+        assert pragma(connection, 'cache_size') == -65536
+
+def test_engine_settings_are_logged_at_startup(tmp_path, caplog):
+    with caplog.at_level(logging.INFO):
+        create_app('testing', {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'logged.db'}",
+            'SQLITE_SYNCHRONOUS': 'full',
+            'SQLITE_MMAP_SIZE': 0
+        })
+    
+    messages = [record.getMessage() for record in caplog.records if 'Database engine' in record.getMessage()]
+    assert messages == ['Database engine default (sqlite): journal_mode=wal, synchronous=full, '
+                        'busy_timeout=5000, cache_size=-65536, mmap_size=0']
+
+def test_invalid_sqlite_setting_fails_at_startup(tmp_path):
+    with pytest.raises(ValueError, match='SQLITE_JOURNAL_MODE'):
+        create_app('testing', {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'bad.db'}",
+            'SQLITE_JOURNAL_MODE': 'wal; DROP TABLE users'
+        })
+
+def test_server_databases_get_pool_options():
+    config = {
+        'SQLALCHEMY_DATABASE_URI': 'postgresql://app@db/performance_db',
+        'DB_POOL_SIZE': 5, 'DB_MAX_OVERFLOW': 0, 'DB_POOL_RECYCLE': 600, 'DB_POOL_PRE_PING': True
+    }
+    assert engine_options(config) == {
+        'pool_size': 5, 'max_overflow': 0, 'pool_recycle': 600, 'pool_pre_ping': True
+    }
+    
+    config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///performance.db'
+    assert engine_options(config) == {}
@@ -0,0 +1,156 @@
+import pytest
+import json
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Goal, Skill
+
+@pytest.fixture
+def app():
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+        'PASSWORD_HASH_SCHEME': 'pbkdf2',
+        'PASSWORD_HASH_PARAMS': {'pbkdf2': {'iterations': 1000}}
+    })
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def users(app):
+    manager = User(email='manager@example.com', first_name='Mia', last_name='Manager', role='manager')
+    manager.set_password('password123')
+    db.session.add(manager)
+    db.session.commit()
+    employee = User(email='employee@example.com', first_name='Eve', last_name='Employee',
+                    role='employee', manager_id=manager.id)
+    employee.set_password('password123')
+    db.session.add(employee)
+    db.session.commit()
+    db.session.add(Goal(employee_id=employee.id, title='Ship it'))
+    db.session.add(Skill(employee_id=employee.id, skill_name='SQL', proficiency_level=2))
+    db.session.commit()
+    return manager, employee
+
+@pytest.fixture
+def headers(client, users):
+    response = client.post('/api/auth/login',
+                          data=json.dumps({'email': 'manager@example.com', 'password': 'password123'}),
+                          content_type='application/json')
+    return {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+
+@contextmanager
+def count_queries():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+def revalidate(client, url, headers):
+    """GET url, then GET it again with the ETag it returned."""
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert etag.startswith('W/"')
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    return etag, client.get(url, headers={**headers, 'If-None-Match': etag})
+
+@pytest.mark.parametrize('endpoint', ['/api/goals', '/api/reviews', '/api/skills', '/api/employees'])
+def test_unchanged_list_returns_304_before_the_page_query(client, headers, endpoint):
+    etag, response = revalidate(client, endpoint, headers)
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+    with count_queries() as statements:
+        response = client.get(endpoint, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    # Only the aggregate runs (the employee list also writes its audit entry)
+    reads = [s for s in statements if s.startswith('SELECT')]
+    assert len(reads) == 1
+    assert 'max(' in reads[0]
+
+def test_list_etag_changes_with_rows_and_request(client, users, headers):
+    manager, employee = users
+    etag, _ = revalidate(client, '/api/goals', headers)
+
+    goal = Goal.query.first()
+    response = client.patch(f'/api/goals/{goal.id}', data=json.dumps({'progress': 50}),
+                            content_type='application/json', headers=headers)
+    assert response.status_code == 200
+    updated, _ = revalidate(client, '/api/goals', headers)
+    assert updated != etag
+
+    db.session.add(Goal(employee_id=employee.id, title='Another'))
+    db.session.commit()
+    added, _ = revalidate(client, '/api/goals', headers)
+    assert added != updated
+
+    db.session.delete(Goal.query.filter_by(title='Another').one())
+    db.session.commit()
+    deleted, _ = revalidate(client, '/api/goals', headers)
+    assert deleted != added
+    assert deleted == updated  # back to the same rows
+
+    # A different page, fieldset or format is a different representation
+    assert revalidate(client, '/api/goals?fields=id', headers)[0] != deleted
+    response = client.get('/api/goals', headers={**headers, 'Accept': 'application/x-ndjson',
+                                                  'If-None-Match': deleted})
+    assert response.status_code == 200
+
+def test_detail_etag_follows_the_row(client, users, headers):
+    manager, employee = users
+    skill = Skill.query.first()
+    url = f'/api/skills/{skill.id}'
+    etag, response = revalidate(client, url, headers)
+    assert response.status_code == 304
+
+    response = client.patch(url, data=json.dumps({'proficiency_level': 3}),
+                            content_type='application/json', headers=headers)
+    assert response.status_code == 200
+    response = client.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert json.loads(response.data)['proficiency_level'] == 3
+
+def test_detail_etag_covers_names_and_includes(client, users, headers):
+    manager, employee = users
+    goal_url = f'/api/goals/{Goal.query.first().id}'
+    employee_url = f'/api/employees/{employee.id}?include=goals'
+    goal_etag, _ = revalidate(client, goal_url, headers)
+    employee_etag, response = revalidate(client, employee_url, headers)
+    assert response.status_code == 304
+
+    db.session.add(Goal(employee_id=employee.id, title='Another'))
+    db.session.commit()
+    assert client.get(employee_url, headers={**headers, 'If-None-Match': employee_etag}).status_code == 200
+
+    # The goal row is untouched, but its employee_name is not
+    employee.first_name = 'Eva'
+    db.session.commit()
+    response = client.get(goal_url, headers={**headers, 'If-None-Match': goal_etag})
+    assert response.status_code == 200
+    assert json.loads(response.data)['employee_name'] == 'Eva Employee'
+
+def test_etag_is_per_principal(client, users, headers):
+    etag, _ = revalidate(client, '/api/goals', headers)
+    response = client.post('/api/auth/login',
+                          data=json.dumps({'email': 'employee@example.com', 'password': 'password123'}),
+                          content_type='application/json')
+    employee_headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+
+    response = client.get('/api/goals', headers={**employee_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
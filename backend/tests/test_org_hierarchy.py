@@ -0,0 +1,120 @@
+import pytest
+import json
+from app import create_app, db
+from app.models import User, Goal, OrgClosure
+
+@pytest.fixture
+def app():
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False
+    })
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def org(app):
+    def create(email, role, manager=None):
+        user = User(
+            email=email,
+            first_name=email.split('@')[0].title(),
+            last_name='User',
+            role=role,
+            manager_id=manager.id if manager else None
+        )
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    
+    director = create('director@example.com', 'manager')
+    manager = create('manager@example.com', 'manager', director)
+    employee = create('employee@example.com', 'employee', manager)
+    other = create('other@example.com', 'manager')
+    return {'director': director, 'manager': manager, 'employee': employee, 'other': other}
+
+def login(client, email):
+    response = client.post('/api/auth/login',
+                          data=json.dumps({
+                              'email': email,
+                              'password': 'password123'
+                          }),
+                          content_type='application/json')
+    token = json.loads(response.data)['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+def subtree(user):
+    return sorted(db.session.execute(OrgClosure.subtree_ids(user.id)).scalars())
+
+def test_closure_tracks_inserts_and_reassignment(org):
+    director, manager, employee, other = org['director'], org['manager'], org['employee'], org['other']
+    
+    assert subtree(director) == [manager.id, employee.id]
+    assert OrgClosure.contains(director.id, employee.id)
+    
+    manager.manager_id = other.id
+    db.session.commit()
+    
+    assert subtree(director) == []
+    assert subtree(other) == [manager.id, employee.id]
+    
+    expected = sorted(db.session.query(
+        OrgClosure.ancestor_id, OrgClosure.descendant_id, OrgClosure.depth).all())
+    OrgClosure.rebuild()
+    assert sorted(db.session.query(
+        OrgClosure.ancestor_id, OrgClosure.descendant_id, OrgClosure.depth).all()) == expected
+
+def test_reassignment_into_own_subtree_is_rejected(org):
+    director, employee = org['director'], org['employee']
+    
+    director.manager_id = employee.id
+    with pytest.raises(ValueError):
+        db.session.commit()
+    db.session.rollback()
+    
+    assert subtree(director) == [org['manager'].id, employee.id]
+
+def test_director_sees_skip_level_goals(client, org):
+    goal = Goal(employee_id=org['employee'].id, title='Ship it')
+    db.session.add(goal)
+    db.session.commit()
+    
+    director_headers = login(client, 'director@example.com')
+    response = client.get('/api/goals', headers=director_headers)
+    assert [g['id'] for g in json.loads(response.data)] == [goal.id]
+    assert client.get(f'/api/goals/{goal.id}', headers=director_headers).status_code == 200
+    
+    other_headers = login(client, 'other@example.com')
+    assert json.loads(client.get('/api/goals', headers=other_headers).data) == []
+    assert client.get(f'/api/goals/{goal.id}', headers=other_headers).status_code == 403
+
+def test_dashboard_aggregates_whole_subtree(client, org):
+    db.session.add(Goal(employee_id=org['employee'].id, title='Ship it', status='completed'))
+    db.session.add(Goal(employee_id=org['manager'].id, title='Hire', status='active'))
+    db.session.commit()
+    
+    response = client.get('/api/analytics/dashboard', headers=login(client, 'director@example.com'))
+    data = json.loads(response.data)
+    
+    assert response.status_code == 200
+    assert data['total_employees'] == 2
+    assert data['total_goals'] == 2
+    assert data['goal_completion_rate'] == 50.0
+
+def test_detail_view_distinguishes_missing_from_forbidden(client, org):
+    goal = Goal(employee_id=org['employee'].id, title='Ship it')
+    db.session.add(goal)
+    db.session.commit()
+    headers = login(client, 'other@example.com')
+    
+    assert client.get(f'/api/goals/{goal.id}', headers=headers).status_code == 403
+    assert client.get(f'/api/goals/{goal.id + 1}', headers=headers).status_code == 404
@@ -0,0 +1,145 @@
+import pytest
+import json
+from datetime import datetime
+from app import create_app, db
+from app.models import User, Goal
+
+@pytest.fixture
+def app():
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False
+    })
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def admin_headers(client):
+    user = User(
+        email='admin@example.com',
+        first_name='Admin',
+        last_name='User',
+        role='admin'
+    )
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    
+    # Several goals share a timestamp so the id tie-breaker is exercised
+    for i in range(7):
+        created_at = datetime(2024, 1, 1 + i // 3)
+        db.session.add(Goal(employee_id=user.id, title=f'Goal {i}', created_at=created_at))
+    db.session.commit()
+    
+    response = client.post('/api/auth/login',
+                          data=json.dumps({
+                              'email': 'admin@example.com',
+                              'password': 'password123'
+                          }),
+                          content_type='application/json')
+    token = json.loads(response.data)['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+def test_keyset_pages_cover_every_row_once(client, admin_headers):
+    seen = []
+    url = '/api/goals?limit=3'
+    pages = 0
+    while url:
+        response = client.get(url, headers=admin_headers)
+        assert response.status_code == 200
+        seen.extend(goal['title'] for goal in json.loads(response.data))
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        url = f'/api/goals?limit=3&cursor={cursor}' if cursor else None
+        if cursor:
+            assert 'rel="next"' in response.headers['Link']
+    
+    assert pages == 3
+    assert seen == [f'Goal {i}' for i in range(7)]
+
+def test_page_size_is_capped(client, app, admin_headers):
+    app.config['PAGE_SIZE_MAX'] = 2
+    
+    response = client.get('/api/goals?limit=1000', headers=admin_headers)
+    
+    assert len(json.loads(response.data)) == 2
+    assert 'X-Next-Cursor' in response.headers
+
+def test_invalid_cursor_is_rejected(client, admin_headers):
+    response = client.get('/api/goals?cursor=not-a-cursor', headers=admin_headers)
+    
+    assert response.status_code == 400
+    assert json.loads(response.data)['message'] == 'Invalid cursor'
+
+def test_ndjson_streams_every_row(client, app, admin_headers):
+    app.config['PAGE_SIZE_MAX'] = 2
+    app.config['NDJSON_BATCH_SIZE'] = 3
+    headers = {**admin_headers, 'Accept': 'application/x-ndjson'}
+    
+    response = client.get('/api/goals', headers=headers)
+    
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['title'] for line in lines] == [f'Goal {i}' for i in range(7)]
+
+def fetch_all(client, headers, url):
+    rows = []
+    while url:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        rows.extend(json.loads(response.data))
+        cursor = response.headers.get('X-Next-Cursor')
+        url = response.headers['Link'].split('>')[0].lstrip('<') if cursor else None
+    return rows
+
+def test_goal_filters(client, admin_headers):
+    goals = Goal.query.order_by(Goal.id).all()
+    goals[0].status = 'active'
+    goals[1].status = 'completed'
+    goals[1].manager_approved = True
+    goals[2].target_date = datetime(2024, 3, 1).date()
+    goals[3].target_date = datetime(2024, 6, 1).date()
+    db.session.commit()
+    
+    def titles(query):
+        response = client.get(f'/api/goals?{query}', headers=admin_headers)
+        assert response.status_code == 200
+        return sorted(goal['title'] for goal in json.loads(response.data))
+    
+    assert titles('status=active,completed') == ['Goal 0', 'Goal 1']
+    assert titles('status=active&manager_approved=false') == ['Goal 0']
+    assert titles('manager_approved=true') == ['Goal 1']
+    assert titles('target_date_from=2024-02-01&target_date_to=2024-04-01') == ['Goal 2']
+    assert titles('employee_id=999') == []
+
+@pytest.mark.parametrize('query', ['status=bogus', 'target_date_from=soon', 'sort=password_hash'])
+def test_invalid_filters_are_rejected(client, admin_headers, query):
+    response = client.get(f'/api/goals?{query}', headers=admin_headers)
+    assert response.status_code == 400
+
+def test_sorted_pages_cover_every_row_once(client, admin_headers):
+    goals = Goal.query.order_by(Goal.id).all()
+    # Duplicate and missing target dates exercise the id and NULL handling
+    for goal, day in zip(goals, [5, 3, 3, None, 1, None, 3]):
+        goal.target_date = datetime(2024, 1, day).date() if day else None
+    db.session.commit()
+    
+    ascending = fetch_all(client, admin_headers, '/api/goals?limit=2&sort=target_date')
+    descending = fetch_all(client, admin_headers, '/api/goals?limit=2&sort=-target_date&fields=id')
+    
+    assert [g['target_date'] for g in ascending] == [
+        '2024-01-01', '2024-01-03', '2024-01-03', '2024-01-03', '2024-01-05', None, None]
+    assert [g['id'] for g in ascending][1:4] == sorted(g['id'] for g in ascending[1:4])
+    assert len({g['id'] for g in descending}) == 7
+    assert descending[0]['id'] == goals[0].id
@@ -0,0 +1,481 @@
+import pytest
+import json
+import re
+from contextlib import contextmanager
+from datetime import date
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Goal, Review, Skill, GoalCategory
+from app.schemas import UserSchema, GoalSchema, ReviewSchema, SkillSchema
+from app.utils.queries import _scoped_statement
+
+@pytest.fixture
+def app():
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False,
+        'RAISE_ON_LAZY_LOAD': True,
+        'PASSWORD_HASH_WORKERS': 0,
+        'PASSWORD_HASH_SCHEME': 'pbkdf2',
+        'PASSWORD_HASH_PARAMS': {'pbkdf2': {'iterations': 1000}}
+    })
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def users(app):
+    manager = User(email='manager@example.com', first_name='Mia', last_name='Manager', role='manager')
+    manager.set_password('password123')
+    db.session.add(manager)
+    db.session.commit()
+    employees = []
+    for i in range(3):
+        employee = User(email=f'e{i}@example.com', first_name=f'E{i}', last_name='Employee',
+                        role='employee', manager_id=manager.id)
+        employee.set_password('password123')
+        employees.append(employee)
+    db.session.add_all(employees)
+    db.session.commit()
+    return manager, employees
+
+def login(client, email):
+    response = client.post('/api/auth/login',
+                          data=json.dumps({
+                              'email': email,
+                              'password': 'password123'
+                          }),
+                          content_type='application/json')
+    token = json.loads(response.data)['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture
+def headers(client, users):
+    return login(client, 'manager@example.com')
+
+@contextmanager
+def count_queries():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+def add_rows(users, count):
+    manager, employees = users
+    for i in range(count):
+        employee = employees[i % len(employees)]
+        db.session.add(Goal(employee_id=employee.id, title=f'Goal {i}'))
+        db.session.add(Review(reviewee_id=employee.id, reviewer_id=manager.id,
+                              review_type='manager', comments=f'Review {i}'))
+    db.session.commit()
+
+@pytest.mark.parametrize('endpoint', ['/api/goals', '/api/reviews'])
+def test_list_query_count_does_not_grow_with_rows(client, users, headers, endpoint):
+    client.get(endpoint, headers=headers)  # warm the principal cache
+    
+    add_rows(users, 2)
+    with count_queries() as few:
+        assert client.get(endpoint, headers=headers).status_code == 200
+    
+    add_rows(users, 10)
+    with count_queries() as many:
+        response = client.get(endpoint, headers=headers)
+    
+    assert response.status_code == 200
+    assert len(json.loads(response.data)) == 12
+    assert len(many) == len(few)
+
+def test_detail_views_load_names_eagerly(client, users, headers):
+    add_rows(users, 1)
+    review = Review.query.first()
+    goal = Goal.query.first()
+    db.session.expunge_all()
+    
+    response = client.get(f'/api/reviews/{review.id}', headers=headers)
+    assert json.loads(response.data)['reviewer_name'] == 'Mia Manager'
+    response = client.get(f'/api/goals/{goal.id}', headers=headers)
+    assert json.loads(response.data)['employee_name'] == 'E0 Employee'
+
+# A bare "SCAN <table>" in SQLite's plan is a full table scan; "SCAN ... USING
+# INDEX" walks an index in order and "SEARCH" is an index lookup.
+FULL_SCAN = re.compile(r'^SCAN (users|goals|reviews|skills|audit_logs|org_closure)\b(?!.*USING)')
+
+def query_plans(statements):
+    connection = db.session.connection()
+    for statement, parameters in statements:
+        if statement.lstrip().upper().startswith('SELECT'):
+            plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+            yield statement, [row[3] for row in plan]
+
+@contextmanager
+def capture_statements():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+SCOPED_ENDPOINTS = [
+    '/api/goals', '/api/goals/1', '/api/reviews', '/api/reviews/1',
+    '/api/reviews?facets=review_period,review_type,status',
+    '/api/skills', '/api/skills/1', '/api/employees', '/api/employees/2',
+    '/api/analytics/dashboard', '/api/analytics/performance-trends',
+    '/api/analytics/team-comparison', '/api/analytics/skills-gap',
+]
+
+@pytest.mark.parametrize('email', ['manager@example.com', 'e0@example.com'])
+@pytest.mark.parametrize('endpoint', SCOPED_ENDPOINTS)
+def test_scoped_queries_use_indexes(client, users, email, endpoint):
+    add_rows(users, 3)
+    db.session.add(Skill(employee_id=users[1][0].id, skill_name='SQL', proficiency_level=2, target_level=4))
+    db.session.commit()
+    headers = login(client, email)
+    
+    with capture_statements() as statements:
+        client.get(endpoint, headers=headers)
+    
+    for statement, plan in query_plans(statements):
+        scans = [step for step in plan if FULL_SCAN.match(step)]
+        assert not scans, f'{endpoint} runs a full scan {scans} for:\n{statement}'
+
+@pytest.mark.parametrize('endpoint', [
+    '/api/goals', '/api/reviews', '/api/skills', '/api/employees',
+    '/api/goals?status=active', '/api/goals?target_date_from=2024-01-01&sort=target_date',
+    '/api/reviews?review_period=2024-Q1',
+])
+def test_admin_lists_walk_the_keyset_index(client, users, endpoint):
+    admin = User(email='admin@example.com', first_name='Ada', last_name='Admin', role='admin')
+    admin.set_password('password123')
+    db.session.add(admin)
+    db.session.commit()
+    headers = login(client, 'admin@example.com')
+    
+    with capture_statements() as statements:
+        client.get(endpoint, headers=headers)
+    
+    list_plans = [plan for statement, plan in query_plans(statements) if 'ORDER BY' in statement]
+    assert list_plans
+    for plan in list_plans:
+        assert not any(FULL_SCAN.match(step) for step in plan), plan
+        assert not any('TEMP B-TREE FOR ORDER BY' in step for step in plan), plan
+
+def test_sparse_fieldsets_skip_unrequested_columns(client, users, headers):
+    add_rows(users, 3)
+    
+    with count_queries() as statements:
+        response = client.get('/api/reviews?fields=id,overall_rating,reviewer_name', headers=headers)
+    
+    assert response.status_code == 200
+    reviews = json.loads(response.data)
+    assert len(reviews) == 3
+    assert set(reviews[0]) == {'id', 'overall_rating', 'reviewer_name'}
+    assert reviews[0]['reviewer_name'] == 'Mia Manager'
+    select = next(s for s in statements if 'FROM reviews' in s)
+    assert 'reviews.comments' not in select
+    assert 'reviews.strengths' not in select
+
+@pytest.mark.parametrize('endpoint', ['/api/goals/1', '/api/employees/2'])
+def test_sparse_fieldsets_on_detail_views(client, users, headers, endpoint):
+    add_rows(users, 1)
+    db.session.expunge_all()
+    
+    response = client.get(f'{endpoint}?fields=id', headers=headers)
+    
+    assert response.status_code == 200
+    assert json.loads(response.data) == {'id': int(endpoint.rsplit('/', 1)[1])}
+
+def test_unknown_fields_are_rejected(client, users, headers):
+    response = client.get('/api/goals?fields=id,password_hash', headers=headers)
+    
+    assert response.status_code == 400
+    assert 'password_hash' in json.loads(response.data)['message']
+
+@pytest.mark.parametrize('endpoint, model, schema', [
+    ('/api/goals', Goal, GoalSchema),
+    ('/api/reviews', Review, ReviewSchema),
+    ('/api/skills', Skill, SkillSchema),
+    ('/api/employees', User, UserSchema),
+])
+def test_list_records_match_schema_dump(client, users, headers, endpoint, model, schema):
+    manager, employees = users
+    add_rows(users, 2)
+    db.session.add(Goal(employee_id=employees[0].id, title='Dated', target_date=date(2024, 6, 30)))
+    db.session.add(Skill(employee_id=employees[0].id, skill_name='SQL', proficiency_level=3,
+                         last_assessed=date(2024, 1, 15)))
+    employees[1].hire_date = date(2020, 3, 1)
+    db.session.commit()
+    
+    response = client.get(endpoint, headers=headers)
+    
+    rows = model.query.order_by(model.created_at, model.id).all()
+    if model is User:
+        rows = [user for user in rows if user.id != manager.id]
+    assert json.loads(response.data) == json.loads(json.dumps(schema(many=True).dump(rows)))
+
+def test_patch_is_a_single_update_returning(client, users, headers):
+    manager, employees = users
+    add_rows(users, 1)
+    goal = Goal.query.first()
+    db.session.expunge_all()
+    client.get('/api/goals', headers=headers)  # warm the principal cache
+    
+    with count_queries() as statements:
+        response = client.patch(f'/api/goals/{goal.id}',
+                                data=json.dumps({'progress': 40, 'status': 'active'}),
+                                content_type='application/json',
+                                headers=headers)
+    
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['progress'] == 40
+    assert data['status'] == 'active'
+    assert data['title'] == 'Goal 0'
+    assert data['employee_name'] == 'E0 Employee'
+    goal_statements = [s for s in statements if 'goals' in s]
+    assert len(goal_statements) == 1
+    assert goal_statements[0].startswith('UPDATE goals')
+    assert 'RETURNING' in goal_statements[0]
+
+def test_patch_writes_status_and_assessment_fields(client, users, headers):
+    manager, employees = users
+    add_rows(users, 1)
+    review = Review.query.first()
+    skill = Skill(employee_id=employees[0].id, skill_name='SQL', proficiency_level=2)
+    db.session.add(skill)
+    db.session.commit()
+    
+    response = client.patch(f'/api/reviews/{review.id}', data=json.dumps({'status': 'completed'}),
+                            content_type='application/json', headers=headers)
+    assert response.status_code == 200
+    assert json.loads(response.data)['status'] == 'completed'
+    
+    response = client.patch(f'/api/skills/{skill.id}', data=json.dumps({'last_assessed': '2024-06-30'}),
+                            content_type='application/json', headers=headers)
+    assert response.status_code == 200
+    assert json.loads(response.data)['last_assessed'] == '2024-06-30'
+    
+    db.session.expire_all()
+    assert db.session.get(Review, review.id).status == 'completed'
+    assert db.session.get(Skill, skill.id).last_assessed == date(2024, 6, 30)
+
+def test_patch_clears_nullable_fields(client, users, headers):
+    manager, employees = users
+    goal = Goal(employee_id=employees[0].id, title='Ship it', description='Soon',
+                category='Delivery', target_date=date(2024, 6, 30))
+    db.session.add(goal)
+    db.session.commit()
+    
+    response = client.patch(f'/api/goals/{goal.id}',
+                            data=json.dumps({'target_date': None, 'description': None, 'category': None}),
+                            content_type='application/json', headers=headers)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['target_date'] is None and data['description'] is None and data['category'] is None
+    
+    db.session.expire_all()
+    goal = db.session.get(Goal, goal.id)
+    assert goal.target_date is None and goal.category is None
+    
+    # Required columns still cannot be cleared
+    response = client.patch(f'/api/goals/{goal.id}', data=json.dumps({'title': None}),
+                            content_type='application/json', headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('payload', [{'status': 'archived'}, {'reviewee_id': 1}, {'rating': 5}])
+def test_patch_rejects_invalid_and_unknown_fields(client, users, headers, payload):
+    add_rows(users, 1)
+    review = Review.query.first()
+    
+    response = client.patch(f'/api/reviews/{review.id}', data=json.dumps(payload),
+                            content_type='application/json', headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('resource, field, value', [
+    ('employees', 'position', 'Lead'),
+    ('goals', 'title', 'Renamed'),
+    ('reviews', 'comments', 'Rewritten'),
+    ('skills', 'proficiency_level', 4),
+])
+def test_put_accepts_a_record_echoed_from_get(client, users, headers, resource, field, value):
+    manager, employees = users
+    add_rows(users, 1)
+    db.session.add(Skill(employee_id=employees[0].id, skill_name='SQL', proficiency_level=2))
+    db.session.commit()
+    row_id = {'employees': employees[0].id, 'goals': Goal.query.first().id,
+              'reviews': Review.query.first().id, 'skills': Skill.query.first().id}[resource]
+    url = f'/api/{resource}/{row_id}'
+    
+    body = json.loads(client.get(url, headers=headers).data)
+    body[field] = value
+    response = client.put(url, data=json.dumps(body), content_type='application/json', headers=headers)
+    assert response.status_code == 200
+    assert json.loads(client.get(url, headers=headers).data)[field] == value
+    
+    # PATCH stays strict about the read-only keys
+    response = client.patch(url, data=json.dumps(body), content_type='application/json', headers=headers)
+    assert response.status_code == 400
+
+def test_put_accepts_edit_form_values(client, users, headers):
+    manager, employees = users
+    form = {'email': 'e0@example.com', 'password': '', 'first_name': 'Eve', 'last_name': 'Employee',
+            'role': 'employee', 'department': '', 'position': '', 'manager_id': '', 'hire_date': ''}
+    
+    response = client.put(f'/api/employees/{employees[0].id}', data=json.dumps(form),
+                          content_type='application/json', headers=headers)
+    
+    assert response.status_code == 200
+    employee = db.session.get(User, employees[0].id)
+    assert employee.first_name == 'Eve'
+    assert employee.manager_id is None and employee.hire_date is None
+
+def test_review_facets_share_one_statement_with_the_page(client, users, headers):
+    manager, employees = users
+    for i, (period, review_type) in enumerate([('2024-Q1', 'manager'), ('2024-Q1', 'peer'),
+                                               ('2024-Q2', 'manager'), (None, 'self')]):
+        db.session.add(Review(reviewee_id=employees[i % 3].id, reviewer_id=manager.id,
+                              review_type=review_type, review_period=period))
+    db.session.commit()
+    client.get('/api/reviews', headers=headers)  # warm the principal cache
+    
+    with count_queries() as statements:
+        response = client.get('/api/reviews?review_type=manager,peer&limit=2'
+                              '&facets=review_period,review_type&fields=id,review_period',
+                              headers=headers)
+    
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [review['review_period'] for review in data['items']] == ['2024-Q1', '2024-Q1']
+    assert data['facets'] == {
+        'review_period': {'2024-Q1': 2, '2024-Q2': 1},
+        'review_type': {'manager': 2, 'peer': 1},
+    }
+    assert response.headers['X-Next-Cursor']
+    # The ETag check, then the page and its facets together
+    assert len([s for s in statements if 'reviews' in s]) == 2
+    assert 'max(reviews.updated_at)' in statements[0]
+    
+    response = client.get(f"/api/reviews?review_type=manager,peer&limit=2&facets=review_type"
+                          f"&cursor={response.headers['X-Next-Cursor']}", headers=headers)
+    data = json.loads(response.data)
+    assert [review['review_period'] for review in data['items']] == ['2024-Q2']
+    assert data['facets'] == {'review_type': {'manager': 2, 'peer': 1}}
+
+def test_review_filters_without_facets_return_a_list(client, users, headers):
+    add_rows(users, 2)
+    
+    response = client.get('/api/reviews?status=submitted', headers=headers)
+    assert json.loads(response.data) == []
+    response = client.get('/api/reviews?status=draft&review_type=manager', headers=headers)
+    assert len(json.loads(response.data)) == 2
+    response = client.get('/api/reviews?facets=comments', headers=headers)
+    assert response.status_code == 400
+
+def test_employee_include_loads_each_relation_in_one_query(client, users, headers):
+    manager, employees = users
+    add_rows(users, 6)
+    db.session.add(Skill(employee_id=employees[0].id, skill_name='SQL', proficiency_level=3))
+    db.session.commit()
+    employee_id = employees[0].id
+    client.get('/api/goals', headers=headers)  # warm the principal cache
+    
+    with count_queries() as statements:
+        response = client.get(f'/api/employees/{employee_id}'
+                              '?include=goals,skills,reviews,direct_reports', headers=headers)
+    
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [goal['title'] for goal in data['goals']] == ['Goal 0', 'Goal 3']
+    assert [review['reviewer_name'] for review in data['reviews']] == ['Mia Manager'] * 2
+    assert [skill['skill_name'] for skill in data['skills']] == ['SQL']
+    assert data['direct_reports'] == []
+    # The employee, one ETag check covering all includes, one query per include
+    assert len(statements) == 6
+    
+    response = client.get(f'/api/employees/{manager.id}?include=direct_reports&fields=id',
+                          headers=headers)
+    data = json.loads(response.data)
+    assert sorted(report['id'] for report in data['direct_reports']) == [e.id for e in employees]
+    assert set(data) == {'id', 'direct_reports'}
+
+def test_employee_include_respects_the_caller_scope(client, users):
+    manager, employees = users
+    add_rows(users, 3)
+    headers = login(client, 'e0@example.com')
+    
+    response = client.get(f'/api/employees/{employees[0].id}?include=goals,reviews', headers=headers)
+    assert response.status_code == 200
+    assert len(json.loads(response.data)['goals']) == 1
+    
+    response = client.get(f'/api/employees/{employees[1].id}?include=goals', headers=headers)
+    assert response.status_code == 403
+    
+    response = client.get(f'/api/employees/{employees[0].id}?include=salary', headers=headers)
+    assert response.status_code == 400
+
+def test_lookup_fields_read_and_write_names(client, users, headers):
+    for category in ['Growth', '  growth ', 'Delivery']:
+        response = client.post('/api/goals', data=json.dumps({'title': category, 'category': category}),
+                               content_type='application/json', headers=headers)
+        assert response.status_code == 201
+    
+    assert sorted(c.name for c in GoalCategory.query) == ['Delivery', 'Growth']
+    
+    response = client.get('/api/goals?category=GROWTH&sort=title', headers=headers)
+    assert [(g['title'], g['category']) for g in json.loads(response.data)] == [
+        ('  growth ', 'Growth'), ('Growth', 'Growth')]
+    
+    goal_id = Goal.query.filter_by(title='Delivery').one().id
+    response = client.patch(f'/api/goals/{goal_id}', data=json.dumps({'category': 'Leadership'}),
+                            content_type='application/json', headers=headers)
+    assert json.loads(response.data)['category'] == 'Leadership'
+    response = client.get(f'/api/goals/{goal_id}', headers=headers)
+    assert json.loads(response.data)['category'] == 'Leadership'
+
+def test_analytics_group_spelling_variants_together(client, users, headers):
+    manager, employees = users
+    for employee, department, skill in zip(employees, ['Engineering', 'engineering ', 'Sales'],
+                                           ['Python', 'python ', 'SQL']):
+        employee.department = department
+        db.session.add(Skill(employee_id=employee.id, skill_name=skill, category='Programming',
+                             proficiency_level=2, target_level=4))
+    db.session.commit()
+    
+    with count_queries() as statements:
+        response = client.get('/api/analytics/skills-gap', headers=headers)
+    gaps = {gap['skill_name']: gap['employees_affected']
+            for gap in json.loads(response.data)['skills_gaps']}
+    assert gaps == {'Python': 2, 'SQL': 1}
+    assert any('GROUP BY skills.skill_name_id, skills.category_id' in s for s in statements)
+    
+    response = client.get('/api/analytics/dashboard', headers=headers)
+    breakdown = {d['department']: d['count'] for d in json.loads(response.data)['department_breakdown']}
+    assert breakdown == {'Engineering': 2, 'Sales': 1}
+
+def test_detail_statement_is_shared_across_principals(client, users):
+    manager, employees = users
+    add_rows(users, 2)
+    goals = {goal.employee_id: goal.id for goal in Goal.query.all()}
+    _scoped_statement.cache_clear()
+    
+    for own, other in ((employees[0], employees[1]), (employees[1], employees[0])):
+        headers = login(client, own.email)
+        assert client.get(f'/api/goals/{goals[own.id]}', headers=headers).status_code == 200
+        assert client.get(f'/api/goals/{goals[other.id]}', headers=headers).status_code == 403
+    
+    # Both employees ran the same statement with their own ID bound
+    assert _scoped_statement.cache_info().currsize == 1
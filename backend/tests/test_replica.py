@@ -0,0 +1,88 @@
+import pytest
+import json
+from app import create_app, db
+from app.models import User, Goal
+from app.utils.replica import replica_router, REPLICA
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'SQLALCHEMY_BINDS': {'replica': f"sqlite:///{tmp_path / 'replica.db'}"},
+        'REPLICA_LAG_CHECK_INTERVAL': 0,
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+        'PASSWORD_HASH_SCHEME': 'pbkdf2',
+        'PASSWORD_HASH_PARAMS': {'pbkdf2': {'iterations': 1000}}
+    })
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+    # init_app registered metadata for the bind on the shared db; later apps have no such bind
+    db.metadatas.pop(REPLICA, None)
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def headers(app, client):
+    admin = User(email='admin@example.com', first_name='Ada', last_name='Admin', role='admin')
+    admin.set_password('password123')
+    db.session.add(admin)
+    db.session.commit()
+    replica_router.sync()
+    
+    response = client.post('/api/auth/login',
+                          data=json.dumps({'email': 'admin@example.com', 'password': 'password123'}),
+                          content_type='application/json')
+    return {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+
+def add_goal(title):
+    db.session.add(Goal(employee_id=User.query.first().id, title=title))
+    db.session.commit()
+
+def goal_titles(client, headers):
+    response = client.get('/api/goals', headers=headers)
+    assert response.status_code == 200
+    return [goal['title'] for goal in json.loads(response.data)]
+
+def test_list_reads_come_from_the_replica(client, headers):
+    add_goal('Ship it')
+    assert goal_titles(client, headers) == []  # not copied yet
+    
+    replica_router.sync()
+    assert goal_titles(client, headers) == ['Ship it']
+
+def test_writes_stay_on_the_primary(client, headers):
+    response = client.post('/api/goals', data=json.dumps({'title': 'New goal'}),
+                           content_type='application/json', headers=headers)
+    assert response.status_code == 201
+    assert Goal.query.count() == 1
+    
+    # The audit entry written during a replica-routed request lands on the primary
+    response = client.get('/api/analytics/dashboard', headers=headers)
+    assert response.status_code == 200
+    assert json.loads(response.data)['total_goals'] == 0
+    assert db.session.execute(db.text(
+        "SELECT count(*) FROM audit_logs WHERE action = 'view_dashboard'")).scalar() == 1
+
+def test_lagging_replica_falls_back_to_the_primary(app, client, headers):
+    add_goal('Ship it')
+    app.config['REPLICA_MAX_LAG'] = -1
+    assert goal_titles(client, headers) == ['Ship it']
+    
+    app.config['REPLICA_MAX_LAG'] = 60
+    assert goal_titles(client, headers) == []
+
+def test_unreachable_replica_falls_back_to_the_primary(app, client, headers, tmp_path):
+    add_goal('Ship it')
+    with db.engines['replica'].begin() as connection:
+        connection.exec_driver_sql('DROP TABLE replica_sync')
+    
+    assert replica_router.lag() is None
+    assert goal_titles(client, headers) == ['Ship it']
@@ -0,0 +1,172 @@
+import pytest
+import json
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models import User, Goal, Review, Skill, Tombstone
+from app.utils.sync import FEEDS, DELETED, encode_token, prune_tombstones
+
+@pytest.fixture
+def app():
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'AUDIT_LOG_ASYNC': False,
+        'LOGIN_RATE_LIMIT_ENABLED': False,
+        'SYNC_SETTLE_SECONDS': 0,
+        'PASSWORD_HASH_WORKERS': 0,
+        'PASSWORD_HASH_SCHEME': 'pbkdf2',
+        'PASSWORD_HASH_PARAMS': {'pbkdf2': {'iterations': 1000}}
+    })
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def users(app):
+    admin = User(email='admin@example.com', first_name='Ada', last_name='Admin', role='admin')
+    manager = User(email='manager@example.com', first_name='Mia', last_name='Manager', role='manager')
+    for user in (admin, manager):
+        user.set_password('password123')
+    db.session.add_all([admin, manager])
+    db.session.commit()
+    employees = []
+    for i in range(2):
+        employee = User(email=f'e{i}@example.com', first_name=f'E{i}', last_name='Employee',
+                        role='employee', manager_id=manager.id)
+        employee.set_password('password123')
+        employees.append(employee)
+    db.session.add_all(employees)
+    db.session.commit()
+    for employee in employees:
+        db.session.add(Goal(employee_id=employee.id, title=f'{employee.first_name} goal'))
+        db.session.add(Skill(employee_id=employee.id, skill_name='SQL', proficiency_level=2))
+        db.session.add(Review(reviewee_id=employee.id, reviewer_id=manager.id, review_type='manager'))
+    db.session.commit()
+    return admin, manager, employees
+
+def login(client, email):
+    response = client.post('/api/auth/login',
+                          data=json.dumps({'email': email, 'password': 'password123'}),
+                          content_type='application/json')
+    return {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+
+def sync(client, headers, token=None):
+    url = f'/api/sync?since={token}' if token else '/api/sync'
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+def test_initial_download_then_nothing_new(client, users):
+    admin, manager, employees = users
+    headers = login(client, 'e0@example.com')
+
+    data = sync(client, headers)
+    assert [goal['title'] for goal in data['goals']] == ['E0 goal']
+    assert len(data['reviews']) == 1 and len(data['skills']) == 1
+    assert [employee['id'] for employee in data['employees']] == [employees[0].id]
+    assert data['deleted'] == {name: [] for name in FEEDS}
+    assert data['has_more'] is False
+
+    data = sync(client, headers, data['token'])
+    assert all(data[name] == [] for name in FEEDS)
+    assert data['deleted'] == {name: [] for name in FEEDS}
+
+def test_delta_returns_only_changed_rows(client, users):
+    admin, manager, employees = users
+    headers = login(client, 'manager@example.com')
+    token = sync(client, headers)['token']
+
+    goal = Goal.query.filter_by(employee_id=employees[1].id).one()
+    response = client.patch(f'/api/goals/{goal.id}', data=json.dumps({'progress': 40}),
+                            content_type='application/json', headers=headers)
+    assert response.status_code == 200
+    db.session.add(Skill(employee_id=employees[0].id, skill_name='Python', proficiency_level=3))
+    db.session.commit()
+
+    data = sync(client, headers, token)
+    assert [(g['id'], g['progress']) for g in data['goals']] == [(goal.id, 40)]
+    assert [skill['skill_name'] for skill in data['skills']] == ['Python']
+    assert data['reviews'] == [] and data['employees'] == []
+
+def test_deletes_and_deactivations_become_tombstones(client, users):
+    admin, manager, employees = users
+    manager_headers = login(client, 'manager@example.com')
+    other_headers = login(client, 'e1@example.com')
+    manager_token = sync(client, manager_headers)['token']
+    other_token = sync(client, other_headers)['token']
+
+    goal = Goal.query.filter_by(employee_id=employees[0].id).one()
+    goal_id = goal.id
+    db.session.delete(goal)
+    db.session.commit()
+    response = client.delete(f'/api/employees/{employees[0].id}', headers=login(client, 'admin@example.com'))
+    assert response.status_code == 200
+
+    data = sync(client, manager_headers, manager_token)
+    assert data['deleted']['goals'] == [goal_id]
+    assert data['deleted']['employees'] == [employees[0].id]
+    assert data['employees'] == []
+
+    # Neither row was ever visible to the other employee
+    data = sync(client, other_headers, other_token)
+    assert data['deleted'] == {name: [] for name in FEEDS}
+
+def test_batches_page_through_every_row_once(client, app, users):
+    admin, manager, employees = users
+    app.config['SYNC_BATCH_SIZE'] = 2
+    for i in range(5):
+        db.session.add(Goal(employee_id=employees[i % 2].id, title=f'Goal {i}'))
+    db.session.commit()
+    headers = login(client, 'admin@example.com')
+
+    titles, token, calls = [], None, 0
+    while True:
+        data = sync(client, headers, token)
+        assert len(data['goals']) <= 2
+        titles += [goal['title'] for goal in data['goals']]
+        token, calls = data['token'], calls + 1
+        if not data['has_more']:
+            break
+    assert sorted(titles) == sorted(['E0 goal', 'E1 goal'] + [f'Goal {i}' for i in range(5)])
+    assert calls == 4
+
+def test_rows_wait_until_settled(client, app, users):
+    admin, manager, employees = users
+    headers = login(client, 'e0@example.com')
+    token = sync(client, headers)['token']
+
+    app.config['SYNC_SETTLE_SECONDS'] = 60
+    db.session.add(Goal(employee_id=employees[0].id, title='Just now'))
+    db.session.commit()
+    data = sync(client, headers, token)
+    assert data['goals'] == []
+
+    app.config['SYNC_SETTLE_SECONDS'] = 0
+    assert [goal['title'] for goal in sync(client, headers, data['token'])['goals']] == ['Just now']
+
+def test_bad_and_expired_tokens(client, app, users):
+    headers = login(client, 'e0@example.com')
+    assert client.get('/api/sync?since=not-a-token', headers=headers).status_code == 400
+
+    old = datetime.utcnow() - timedelta(days=app.config['SYNC_TOMBSTONE_DAYS'] + 1)
+    token = encode_token({name: (old, None) for name in (*FEEDS, DELETED)})
+    response = client.get(f'/api/sync?since={token}', headers=headers)
+    assert response.status_code == 410
+
+def test_prune_tombstones(app, users):
+    admin, manager, employees = users
+    db.session.delete(Skill.query.first())
+    db.session.commit()
+    old = Tombstone(resource_type='goals', resource_id=99, employee_id=employees[0].id,
+                    deleted_at=datetime.utcnow() - timedelta(days=app.config['SYNC_TOMBSTONE_DAYS'] + 1))
+    db.session.add(old)
+    db.session.commit()
+
+    assert prune_tombstones() == 1
+    assert [t.resource_type for t in Tombstone.query.all()] == ['skills']